@@ -0,0 +1,526 @@
+import argparse
+import asyncio
+import atexit
+import glob
+import gzip
+import json
+import os
+import queue
+import threading
+import time
+import zlib
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+import metrics
+
+
+audit_records = metrics.registry.counter(
+    "fraud_audit_records_total", "Audit log records by result (written, dropped)"
+)
+audit_queue_depth = metrics.registry.gauge(
+    "fraud_audit_queue_depth", "Records waiting to be written to the audit log"
+)
+audit_blocked = metrics.registry.histogram(
+    "fraud_audit_enqueue_blocked_seconds", "Time /predict waited for room in the audit queue"
+)
+
+SEGMENT_GLOB = "audit-*.ndjson.gz*"
+PART_SUFFIX = ".part"
+_TIME_FORMAT = "%Y%m%dT%H%M%S"
+
+
+def _segment_time(value: float) -> str:
+    return datetime.fromtimestamp(value).strftime(_TIME_FORMAT)
+
+
+def _json_default(value):
+    """Serialize numpy scalars and pydantic models found in records"""
+    if hasattr(value, 'model_dump'):
+        return value.model_dump()
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+
+class AuditLog:
+    """
+    Append-only log of every scoring decision, written by a background thread
+
+    /predict only puts a (timestamp, input, response, versions) tuple on a
+    bounded queue; serialization, compression and disk writes happen on the
+    writer thread in batches. When the writer falls behind, the queue fills and
+    producers wait up to block_seconds for room (backpressure) before the record
+    is dropped and counted. Coroutines use record_async, which waits in a worker
+    thread so the event loop keeps serving other requests meanwhile.
+
+    Records are gzip-compressed NDJSON. Each process writes its own segments,
+    so worker processes never contend for a file. The active segment carries a
+    .part suffix and is sync-flushed after every batch, so it can be read while
+    it grows. It is renamed to audit-<first>-<last>-<pid>-<seq>.ndjson.gz when it
+    rotates, which lets queries skip segments by their time range.
+    """
+
+    def __init__(self, directory: str, max_queue: int = 10000, batch_size: int = 500,
+                 flush_interval: float = 1.0, block_seconds: float = 5.0,
+                 segment_records: int = 100000, segment_seconds: float = 3600):
+        self.directory = directory
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.block_seconds = block_seconds
+        self.segment_records = segment_records
+        self.segment_seconds = segment_seconds
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._pid = None
+        self._sequence = 0
+        self._record_count = 0
+        self._segment = None
+        self.write_errors = 0
+        self.last_error = None
+
+    def _ensure_writer(self):
+        # Threads do not survive fork, so every worker process starts its own writer
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            os.makedirs(self.directory, exist_ok=True)
+            self._pid = os.getpid()
+            self._segment = None
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="audit-log-writer", daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
+
+    def record(self, transaction: Dict[str, Any], response: Any, versions: Dict[str, Any],
+               **extra) -> bool:
+        """
+        Queue a scoring decision for writing, blocking the calling thread while the queue is full
+
+        Args:
+            transaction: Validated request body
+            response: PredictionResponse (serialized on the writer thread)
+            versions: Model and rule-set versions the decision was made with
+            **extra: Additional fields stored with the record (e.g. cached=True)
+
+        Returns:
+            False if the queue stayed full for block_seconds and the record was dropped
+        """
+        item = self._item(transaction, response, versions, extra)
+        try:
+            self._queue.put_nowait(item)
+            return True
+        except queue.Full:
+            return self._put_blocking(item)
+
+    async def record_async(self, transaction: Dict[str, Any], response: Any,
+                           versions: Dict[str, Any], **extra) -> bool:
+        """Like record, but waits for room in a worker thread instead of blocking the event loop"""
+        item = self._item(transaction, response, versions, extra)
+        try:
+            self._queue.put_nowait(item)
+            return True
+        except queue.Full:
+            return await asyncio.to_thread(self._put_blocking, item)
+
+    def _item(self, transaction, response, versions, extra) -> tuple:
+        self._ensure_writer()
+        return (time.time(), transaction, response, versions, extra)
+
+    def _put_blocking(self, item: tuple) -> bool:
+        start = time.perf_counter()
+        try:
+            self._queue.put(item, timeout=self.block_seconds)
+            return True
+        except queue.Full:
+            audit_records.inc(result="dropped")
+            return False
+        finally:
+            audit_blocked.observe(time.perf_counter() - start)
+
+    def _run(self):
+        while not (self._stopping.is_set() and self._queue.empty()):
+            try:
+                batch = [self._queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                self._maybe_rotate()
+                continue
+
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            try:
+                with metrics.span("audit.flush"):
+                    self._write_batch(batch)
+                audit_records.inc(len(batch), result="written")
+            except Exception as e:
+                # Keep the writer alive; the batch is counted as dropped
+                self.write_errors += 1
+                self.last_error = str(e)
+                # Close the failed segment so its file handle is not leaked; the
+                # next batch starts a new one
+                try:
+                    self._close_segment()
+                except Exception:
+                    self._segment = None
+                audit_records.inc(len(batch), result="dropped")
+            for _ in batch:
+                self._queue.task_done()
+            audit_queue_depth.set(self._queue.qsize())
+            self._maybe_rotate()
+
+        self._close_segment()
+
+    def _write_batch(self, batch: List[tuple]):
+        if self._segment is None:
+            self._open_segment(batch[0][0])
+
+        lines = []
+        for timestamp, transaction, response, versions, extra in batch:
+            self._record_count += 1
+            record = {
+                "id": f"{self._pid}-{self._sequence}-{self._record_count}",
+                "ts": timestamp,
+                "input": transaction,
+                "output": response,
+                "versions": versions
+            }
+            record.update(extra)
+            lines.append(json.dumps(record, default=_json_default, separators=(",", ":")))
+
+        segment = self._segment
+        segment["file"].write(("\n".join(lines) + "\n").encode())
+        # Sync-flush so the segment is readable up to this batch while it stays open
+        segment["file"].flush(zlib.Z_SYNC_FLUSH)
+        segment["last_ts"] = batch[-1][0]
+        segment["records"] += len(batch)
+
+    def _open_segment(self, first_ts: float):
+        self._sequence += 1
+        self._record_count = 0
+        path = os.path.join(
+            self.directory,
+            f"audit-{_segment_time(first_ts)}-{self._pid}-{self._sequence}.ndjson.gz{PART_SUFFIX}"
+        )
+        self._segment = {
+            "path": path,
+            "file": gzip.open(path, "ab"),
+            "first_ts": first_ts,
+            "last_ts": first_ts,
+            "opened": time.monotonic(),
+            "records": 0
+        }
+
+    def _maybe_rotate(self):
+        segment = self._segment
+        if segment is None:
+            return
+        if (segment["records"] >= self.segment_records
+                or time.monotonic() - segment["opened"] >= self.segment_seconds):
+            self._close_segment()
+
+    def _close_segment(self):
+        segment, self._segment = self._segment, None
+        if segment is None:
+            return
+        segment["file"].close()
+        final_name = (f"audit-{_segment_time(segment['first_ts'])}-{_segment_time(segment['last_ts'])}"
+                      f"-{self._pid}-{self._sequence}.ndjson.gz")
+        os.replace(segment["path"], os.path.join(self.directory, final_name))
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Wait until every queued record has been written (or dropped)"""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if time.monotonic() > deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def close(self, timeout: float = 10.0):
+        """Write out the queue, close the active segment and stop the writer"""
+        if self._thread is None or self._pid != os.getpid():
+            return
+        self._stopping.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get queue depth and written/dropped counts"""
+        return {
+            "directory": self.directory,
+            "queue_depth": self._queue.qsize(),
+            "max_queue": self.max_queue,
+            "written": audit_records.get(result="written"),
+            "dropped": audit_records.get(result="dropped"),
+            "write_errors": self.write_errors,
+            "last_error": self.last_error
+        }
+
+
+def _segment_range(path: str):
+    """(first, last) timestamps encoded in a segment name; last is None while it is open"""
+    parts = os.path.basename(path).split("-")
+    try:
+        first = datetime.strptime(parts[1], _TIME_FORMAT).timestamp()
+        if path.endswith(PART_SUFFIX):
+            return first, None
+        # Names hold whole seconds; the last record may be up to a second later
+        return first, datetime.strptime(parts[2], _TIME_FORMAT).timestamp() + 1
+    except (IndexError, ValueError):
+        return None, None
+
+
+def _read_segment(path: str) -> Iterator[str]:
+    """Lines of a segment, tolerating the unfinished tail of an open segment"""
+    try:
+        with gzip.open(path, "rt") as f:
+            for line in f:
+                if line.endswith("\n"):
+                    yield line
+    except (EOFError, gzip.BadGzipFile, zlib.error):
+        return
+
+
+def _segments(directory: str, since: Optional[float] = None,
+              until: Optional[float] = None) -> List[str]:
+    """Segments that may overlap the time range, oldest first"""
+    segments = []
+    for path in glob.glob(os.path.join(directory, SEGMENT_GLOB)):
+        first, last = _segment_range(path)
+        if first is not None:
+            if until is not None and first > until:
+                continue
+            if since is not None and last is not None and last < since:
+                continue
+        parts = os.path.basename(path).split("-")
+        sequence = int(parts[-1].split(".")[0]) if parts[-1].split(".")[0].isdigit() else 0
+        segments.append((first or 0, parts[-2], sequence, path))
+    return [path for *_, path in sorted(segments)]
+
+
+def _iter_lines(directory: str, since: Optional[float], until: Optional[float]) -> Iterator[str]:
+    """Raw record lines of the segments that may overlap the time range, oldest first"""
+    for path in _segments(directory, since, until):
+        yield from _read_segment(path)
+
+
+def _in_range(record: Dict[str, Any], since: Optional[float], until: Optional[float]) -> bool:
+    return ((since is None or record["ts"] >= since)
+            and (until is None or record["ts"] < until))
+
+
+def iter_records(directory: str, since: Optional[float] = None,
+                 until: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Iterate audit records in a time range, oldest segment first
+
+    Args:
+        directory: Audit log directory
+        since: Only records at or after this Unix timestamp
+        until: Only records before this Unix timestamp
+
+    Returns:
+        Iterator of record dictionaries
+    """
+    for line in _iter_lines(directory, since, until):
+        record = json.loads(line)
+        if _in_range(record, since, until):
+            yield record
+
+
+def _lookup(record: Dict[str, Any], dotted: str) -> Any:
+    value = record
+    for key in dotted.split("."):
+        if not isinstance(value, dict) or key not in value:
+            return None
+        value = value[key]
+    return value
+
+
+def query(directory: str, since: Optional[float] = None, until: Optional[float] = None,
+          where: Optional[Dict[str, Any]] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Find audit records matching field values
+
+    Args:
+        directory: Audit log directory
+        since: Only records at or after this Unix timestamp
+        until: Only records before this Unix timestamp
+        where: Dotted field paths and required values, e.g.
+            {"output.risk_level": "HIGH", "input.sender_state": "Delhi"}
+        limit: Maximum number of records to return
+
+    Returns:
+        List of matching records
+    """
+    where = where or {}
+    # Every required value must appear verbatim in the raw line, so most
+    # non-matching lines are skipped without being parsed
+    needles = [json.dumps(value) for value in where.values()
+               if isinstance(value, (str, bool)) or value is None]
+
+    matches = []
+    for line in _iter_lines(directory, since, until):
+        if not all(needle in line for needle in needles):
+            continue
+        record = json.loads(line)
+        if not _in_range(record, since, until):
+            continue
+        if all(_lookup(record, field) == value for field, value in where.items()):
+            matches.append(record)
+            if limit is not None and len(matches) >= limit:
+                break
+    return matches
+
+
+def replay(records: List[Dict[str, Any]], rule_engine, ml_model=None) -> Dict[str, Any]:
+    """
+    Re-score logged transactions with the given rules and model in one batch
+
+    Args:
+        records: Audit records (e.g. from query)
+        rule_engine: FraudRuleEngine to score with
+        ml_model: Trained FraudMLModel, or None to compare rule decisions only
+
+    Returns:
+        Dictionary with counts and the records whose final decision changed
+    """
+    import pandas as pd
+
+    if not records:
+        return {"records": 0, "changed": 0, "changes": []}
+
+    df = pd.DataFrame([record["input"] for record in records])
+    if 'amount' in df.columns and 'amount_(inr)' not in df.columns:
+        df['amount_(inr)'] = df['amount']
+
+    scored = rule_engine.apply_rules(df)
+    rule_fraud = scored['rule_based_fraud'].to_numpy(dtype=bool)
+    rule_score = scored['rule_score'].to_numpy(dtype=float)
+    if ml_model is not None and ml_model.is_trained:
+        probabilities = ml_model.predict_proba(scored)
+    else:
+        probabilities = [record["output"]["ml_fraud_probability"] for record in records]
+
+    changes = []
+    for i, record in enumerate(records):
+        # Same hybrid decision as /predict
+        final = bool(rule_fraud[i] or probabilities[i] > 0.5)
+        if final != record["output"]["final_prediction"]:
+            changes.append({
+                "id": record["id"],
+                "ts": record["ts"],
+                "logged_versions": record["versions"],
+                "logged_final_prediction": record["output"]["final_prediction"],
+                "replayed_final_prediction": final,
+                "logged_rule_score": record["output"]["rule_based_score"],
+                "replayed_rule_score": float(rule_score[i]),
+                "logged_ml_probability": record["output"]["ml_fraud_probability"],
+                "replayed_ml_probability": float(probabilities[i])
+            })
+
+    return {"records": len(records), "changed": len(changes), "changes": changes}
+
+
+def latest_rule_set(directory: str) -> Optional[Dict[str, Any]]:
+    """Rule set of the most recently logged decision, or None"""
+    for path in reversed(_segments(directory)):
+        latest = None
+        for line in _read_segment(path):
+            latest = line
+        if latest is not None:
+            return json.loads(latest).get("rule_set")
+    return None
+
+
+def _parse_time(value: Optional[str]) -> Optional[float]:
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+def _parse_where(conditions: List[str]) -> Dict[str, Any]:
+    where = {}
+    for condition in conditions:
+        field, _, raw = condition.partition("=")
+        try:
+            where[field] = json.loads(raw)
+        except ValueError:
+            where[field] = raw
+    return where
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query or replay the prediction audit log")
+    parser.add_argument("command", choices=["query", "replay"])
+    parser.add_argument("--dir", default=os.environ.get(
+        "FRAUD_AUDIT_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "audit_log")))
+    parser.add_argument("--since", help="ISO time or Unix timestamp")
+    parser.add_argument("--until", help="ISO time or Unix timestamp")
+    parser.add_argument("--where", action="append", default=[],
+                        help="field=value on a dotted path, e.g. output.risk_level=HIGH (repeatable)")
+    parser.add_argument("--limit", type=int, help="Maximum records")
+    parser.add_argument("--model-dir", help="Saved model to replay with (default: the model "
+                                            "published in --shared-dir, else rules only)")
+    parser.add_argument("--shared-dir", default=os.environ.get("FRAUD_SHARED_DIR"),
+                        help="Shared state directory of running workers, to replay with their rules")
+    args = parser.parse_args()
+
+    records = query(args.dir, _parse_time(args.since), _parse_time(args.until),
+                    _parse_where(args.where), args.limit)
+
+    if args.command == "query":
+        for record in records:
+            print(json.dumps(record))
+        return
+
+    from fraud_rules import FraudRuleEngine
+
+    # Replay with the live rule set: the one published to the workers' shared
+    # state, else the one the most recent decision in the log was made with
+    state = {}
+    if args.shared_dir:
+        from shared_state import SharedState
+        state = SharedState(args.shared_dir).read_state()
+
+    rule_engine = FraudRuleEngine()
+    rules_source = "defaults"
+    rule_set = state.get("rules") or latest_rule_set(args.dir)
+    if rule_set:
+        rule_engine.set_rule_weights(rule_set["weights"], rule_set["threshold"])
+        rules_source = "shared state" if state.get("rules") else "latest audit record"
+
+    ml_model = None
+    model_dir = args.model_dir or state.get("model", {}).get("path")
+    if model_dir:
+        from ml_model import FraudMLModel
+        ml_model = FraudMLModel(model_dir=model_dir)
+        ml_model.load_model()
+
+    report = replay(records, rule_engine, ml_model)
+    report["rules_source"] = rules_source
+    report["rule_set"] = {"weights": {rule['name']: rule['weight'] for rule in rule_engine.rules},
+                          "threshold": rule_engine.threshold}
+    report["model_dir"] = model_dir
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
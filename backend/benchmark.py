@@ -0,0 +1,335 @@
+import argparse
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from data_processor import DataProcessor
+from fraud_rules import FraudRuleEngine
+from generate_data import generate_transactions
+from ml_model import FraudMLModel
+
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+PREDICT_FIELDS = [
+    'transaction_type', 'merchant_category', 'sender_age_group', 'receiver_age_group',
+    'sender_state', 'sender_bank', 'receiver_bank', 'device_type', 'network_type',
+    'hour_of_day', 'day_of_week', 'is_weekend'
+]
+
+# Raw CSV headers of /predict fields whose names clean_data normalizes
+RAW_COLUMNS = {'transaction_type': 'transaction type'}
+
+
+def _summarize(latencies: List[float], rows_per_call: int, peak_bytes: int = None) -> Dict[str, Any]:
+    """Latency percentiles (ms), throughput and peak memory of a stage"""
+    latencies = np.asarray(latencies)
+    total = float(latencies.sum())
+    return {
+        "calls": int(len(latencies)),
+        "rows_per_call": rows_per_call,
+        "mean_ms": float(latencies.mean() * 1000),
+        "p50_ms": float(np.percentile(latencies, 50) * 1000),
+        "p90_ms": float(np.percentile(latencies, 90) * 1000),
+        "p99_ms": float(np.percentile(latencies, 99) * 1000),
+        "throughput_rows_per_s": rows_per_call * len(latencies) / total if total else None,
+        "peak_memory_mb": peak_bytes / 1024 ** 2 if peak_bytes is not None else None
+    }
+
+
+def _run_stage(setup: Callable[[], Any], func: Callable[[Any], Any], repeats: int,
+               rows_per_call: int) -> Dict[str, Any]:
+    """
+    Time a pipeline stage, then measure its peak memory in one separate traced run
+
+    Args:
+        setup: Builds the stage input (not timed)
+        func: Stage under test, called with the setup result
+        repeats: Number of timed calls
+        rows_per_call: Rows processed per call, for throughput
+
+    Returns:
+        Stage summary
+    """
+    latencies = []
+    for _ in range(repeats):
+        arg = setup()
+        start = time.perf_counter()
+        func(arg)
+        latencies.append(time.perf_counter() - start)
+
+    arg = setup()
+    tracemalloc.start()
+    try:
+        func(arg)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return _summarize(latencies, rows_per_call, peak)
+
+
+def benchmark_pipeline(csv_path: str, repeats: int = 3, single_calls: int = 200,
+                       train: bool = True) -> Dict[str, Any]:
+    """
+    Benchmark each pipeline stage in-process
+
+    Args:
+        csv_path: Dataset to benchmark against
+        repeats: Timed calls of each bulk stage
+        single_calls: Timed calls of each single-transaction stage
+        train: Whether to benchmark model training (needed for predict_proba)
+
+    Returns:
+        Dictionary of stage name to stage summary
+    """
+    results = {}
+
+    def loaded():
+        processor = DataProcessor()
+        processor.load_data(csv_path)
+        return processor
+
+    raw_rows = len(loaded().get_data())
+    results["load_data"] = _run_stage(lambda: csv_path, lambda path: DataProcessor().load_data(path),
+                                      repeats, raw_rows)
+    results["clean_data"] = _run_stage(loaded, lambda processor: processor.clean_data(),
+                                       repeats, raw_rows)
+
+    processor = loaded()
+    processor.clean_data()
+    df = processor.get_data()
+    rows = len(df)
+
+    engine = FraudRuleEngine()
+    results["apply_rules"] = _run_stage(lambda: df, engine.apply_rules, repeats, rows)
+    df_with_rules = engine.apply_rules(df)
+
+    with tempfile.TemporaryDirectory() as model_dir:
+        model = FraudMLModel(model_dir=model_dir)
+        results["prepare_features"] = _run_stage(
+            lambda: df_with_rules, lambda data: model._prepare_features(data, is_training=True),
+            repeats, rows
+        )
+
+        rng = np.random.default_rng(0)
+        sample = df.iloc[rng.integers(0, rows, single_calls)]
+        single_rows = iter([sample.iloc[[i]] for i in range(len(sample))] * 3)
+
+        results["apply_rules_single"] = _run_stage(
+            lambda: next(single_rows), engine.apply_rules, single_calls, 1
+        )
+
+        if train:
+            results["train"] = _run_stage(lambda: df_with_rules, model.train, 1, rows)
+            scored_rows = iter([engine.apply_rules(sample.iloc[[i]]) for i in range(len(sample))] * 2)
+            results["predict_proba_single"] = _run_stage(
+                lambda: next(scored_rows), model.predict_proba, single_calls, 1
+            )
+
+    return results
+
+
+def _request(url: str, method: str = "GET", payload: Dict[str, Any] = None,
+             timeout: float = 600) -> Dict[str, Any]:
+    data = json.dumps(payload).encode() if payload is not None else None
+    request = urllib.request.Request(url, data=data, method=method,
+                                     headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return json.loads(response.read())
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def benchmark_http(csv_path: str, n_requests: int = 2000, concurrency: int = 8,
+                   workers: int = 1) -> Dict[str, Any]:
+    """
+    Benchmark the HTTP endpoints of a uvicorn server started in a subprocess
+
+    Args:
+        csv_path: Dataset the server loads through FRAUD_DATA_PATH
+        n_requests: Number of /predict requests
+        concurrency: Number of concurrent client threads
+        workers: Number of uvicorn worker processes
+
+    Returns:
+        Dictionary of endpoint to summary, plus the server's peak RSS when available
+    """
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    results = {}
+
+    with tempfile.TemporaryDirectory() as scratch_dir:
+        env = dict(os.environ, FRAUD_DATA_PATH=csv_path,
+                   FRAUD_MODEL_DIR=os.path.join(scratch_dir, "model"),
+                   # Audit segments of benchmark traffic are discarded with the server
+                   FRAUD_AUDIT_DIR=os.path.join(scratch_dir, "audit_log"))
+        # Workers must share state to serve consistently, but never through the
+        # caller's shared directory: the benchmark publishes synthetic data there
+        env.pop("FRAUD_SHARED_DIR", None)
+        if workers > 1:
+            env["FRAUD_SHARED_DIR"] = os.path.join(scratch_dir, "shared_state")
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1",
+             "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+            cwd=BACKEND_DIR, env=env
+        )
+        try:
+            deadline = time.time() + 60
+            while True:
+                try:
+                    _request(f"{base_url}/health", timeout=1)
+                    break
+                except OSError:
+                    if time.time() > deadline or server.poll() is not None:
+                        raise RuntimeError("Benchmark server did not start")
+                    time.sleep(0.2)
+
+            for endpoint in ["/load-data", "/clean-data", "/apply-rules", "/train-model"]:
+                start = time.perf_counter()
+                _request(f"{base_url}{endpoint}", method="POST")
+                results[endpoint] = _summarize([time.perf_counter() - start], 1)
+
+            sample = pd.read_csv(csv_path, nrows=max(n_requests, 1000))
+            payloads = [
+                {**{field: row[RAW_COLUMNS.get(field, field)] for field in PREDICT_FIELDS},
+                 "amount": row["amount (INR)"]}
+                for row in sample.to_dict("records")
+            ]
+            payloads = [payloads[i % len(payloads)] for i in range(n_requests)]
+
+            def timed_predict(payload):
+                start = time.perf_counter()
+                try:
+                    _request(f"{base_url}/predict", method="POST", payload=payload)
+                    return time.perf_counter() - start, True
+                except OSError:
+                    return time.perf_counter() - start, False
+
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                outcomes = list(pool.map(timed_predict, payloads))
+            wall = time.perf_counter() - start
+
+            summary = _summarize([latency for latency, _ in outcomes], 1)
+            summary["concurrency"] = concurrency
+            summary["errors"] = sum(1 for _, ok in outcomes if not ok)
+            # Requests overlap, so throughput comes from wall time, not summed latencies
+            summary["throughput_rows_per_s"] = n_requests / wall
+            results["/predict"] = summary
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+
+    try:
+        import resource
+        # ru_maxrss is in KB on Linux (bytes on macOS); covers all waited-for children
+        results["server_peak_rss_mb"] = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+    except ImportError:
+        results["server_peak_rss_mb"] = None
+
+    return results
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """Format p50 latency and peak memory changes between two result files"""
+    lines = []
+    for section in ("pipeline", "http"):
+        for stage, stats in current.get(section, {}).items():
+            old = baseline.get(section, {}).get(stage)
+            if not isinstance(stats, dict) or not isinstance(old, dict):
+                continue
+            line = f"{section} {stage}: p50 {old['p50_ms']:.2f} -> {stats['p50_ms']:.2f} ms"
+            if old.get("peak_memory_mb") and stats.get("peak_memory_mb"):
+                line += f", peak {old['peak_memory_mb']:.1f} -> {stats['peak_memory_mb']:.1f} MB"
+            lines.append(line)
+    return lines
+
+
+def _versions() -> Dict[str, str]:
+    versions = {"python": platform.python_version(), "pandas": pd.__version__, "numpy": np.__version__}
+    for name in ("sklearn", "xgboost", "fastapi"):
+        try:
+            versions[name] = __import__(name).__version__
+        except ImportError:
+            versions[name] = None
+    return versions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the fraud detection pipeline")
+    parser.add_argument("--rows", type=int, default=100000, help="Synthetic dataset size")
+    parser.add_argument("--fraud-rate", type=float, default=0.002, help="Synthetic fraud rate")
+    parser.add_argument("--data", help="Use an existing CSV instead of synthetic data")
+    parser.add_argument("--repeats", type=int, default=3, help="Timed calls per bulk stage")
+    parser.add_argument("--single-calls", type=int, default=200, help="Timed single-row calls")
+    parser.add_argument("--no-train", action="store_true", help="Skip training and prediction")
+    parser.add_argument("--http", action="store_true", help="Also benchmark the HTTP endpoints")
+    parser.add_argument("--requests", type=int, default=2000, help="Number of /predict requests")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent /predict clients")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--output-dir", default=os.path.join(BACKEND_DIR, "benchmark_results"))
+    parser.add_argument("--compare", help="Previous result file to compare against")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        csv_path = args.data
+        if csv_path is None:
+            csv_path = os.path.join(data_dir, "upi_transactions_2024.csv")
+            generate_transactions(args.rows, fraud_rate=args.fraud_rate).to_csv(csv_path, index=False)
+
+        report = {
+            "meta": {
+                "timestamp": datetime.now().isoformat(timespec="seconds"),
+                "data": args.data or "synthetic",
+                "rows": args.rows if args.data is None else None,
+                "fraud_rate": args.fraud_rate if args.data is None else None,
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+                "versions": _versions()
+            },
+            "pipeline": benchmark_pipeline(csv_path, repeats=args.repeats,
+                                           single_calls=args.single_calls,
+                                           train=not args.no_train)
+        }
+        if args.http:
+            report["http"] = benchmark_http(csv_path, n_requests=args.requests,
+                                            concurrency=args.concurrency, workers=args.workers)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    output_path = os.path.join(args.output_dir,
+                               f"benchmark-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    with open(output_path, "w") as f:
+        json.dump(report, f, indent=2)
+
+    for section in ("pipeline", "http"):
+        for stage, stats in report.get(section, {}).items():
+            if isinstance(stats, dict):
+                print(f"{section} {stage}: p50 {stats['p50_ms']:.2f} ms, "
+                      f"p99 {stats['p99_ms']:.2f} ms")
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print("\n".join(compare(report, baseline)))
+    print(f"Results written to {output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,24 +3,55 @@ import numpy as np
 from typing import Dict, Any
 from datetime import datetime
 
+# Copy-on-write lets each pipeline stage share unchanged columns with the
+# loaded dataset instead of deep-copying it (always on from pandas 3.0)
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
+
 
 class DataProcessor:
     def __init__(self):
         self.df = None
         self.original_df = None
         self.cleaning_report = {}
+        self.data_version = 0
+        # Set when df is a read-only snapshot shared with other worker processes
+        self.shared_object_columns = None
     
     def load_data(self, file_path: str):
         """Load data from CSV file"""
         self.df = pd.read_csv(file_path)
-        self.original_df = self.df.copy()
+        # Shallow copy: columns are shared until clean_data modifies them
+        self.original_df = self.df.copy(deep=False)
+        self.shared_object_columns = None
+        self.data_version += 1
         return self.df
+
+    def load_shared(self, df: pd.DataFrame, object_columns: list, cleaning_report: Dict[str, Any]):
+        """
+        Use a read-only dataset published by another worker
+
+        Args:
+            df: Memory-mapped dataframe
+            object_columns: Columns stored as categoricals that were object dtype
+            cleaning_report: Report of the cleaning already applied to df, if any
+        """
+        self.df = df
+        self.original_df = df
+        self.cleaning_report = cleaning_report
+        self.shared_object_columns = object_columns
+        self.data_version += 1
     
     def clean_data(self) -> Dict[str, Any]:
         """Clean and preprocess the data"""
         if self.df is None:
             raise ValueError("No data loaded. Please load data first.")
         
+        # Shared snapshots are read-only: clean a private copy with the original dtypes
+        if self.shared_object_columns is not None:
+            self.df = self.df.astype({col: object for col in self.shared_object_columns}).copy()
+            self.shared_object_columns = None
+        
         report = {
             "original_rows": len(self.df),
             "original_columns": len(self.df.columns),
@@ -38,9 +69,9 @@ class DataProcessor:
         for col in self.df.columns:
             if self.df[col].isnull().any():
                 if self.df[col].dtype in ['int64', 'float64']:
-                    self.df[col].fillna(self.df[col].median(), inplace=True)
+                    self.df[col] = self.df[col].fillna(self.df[col].median())
                 else:
-                    self.df[col].fillna(self.df[col].mode()[0] if not self.df[col].mode().empty else 'Unknown', inplace=True)
+                    self.df[col] = self.df[col].fillna(self.df[col].mode()[0] if not self.df[col].mode().empty else 'Unknown')
         
         missing_after = self.df.isnull().sum()
         report["missing_values"]["after"] = missing_after[missing_after > 0].to_dict()
@@ -113,6 +144,7 @@ class DataProcessor:
         report["rows_removed"] = report["original_rows"] - report["final_rows"]
         
         self.cleaning_report = report
+        self.data_version += 1
         return report
     
     def get_data(self) -> pd.DataFrame:
@@ -0,0 +1,250 @@
+import threading
+import time
+from bisect import bisect_right
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+import metrics
+
+
+feature_psi = metrics.registry.gauge(
+    "fraud_feature_drift_psi", "Population stability index of each model feature, live vs training"
+)
+feature_ks = metrics.registry.gauge(
+    "fraud_feature_drift_ks", "KS distance of each ordered model feature, live vs training"
+)
+drift_window_size = metrics.registry.gauge(
+    "fraud_drift_window_samples", "Predictions in the current drift window"
+)
+
+# Common PSI reading: < 0.1 stable, 0.1-0.25 moderate shift, > 0.25 significant shift
+PSI_WARNING = 0.1
+PSI_ALERT = 0.25
+
+# Floor for empty bins so PSI stays finite
+_EPSILON = 1e-4
+
+
+def build_reference(X: pd.DataFrame, categorical: List[str], n_bins: int = 20,
+                    max_discrete: int = 32) -> Dict[str, Any]:
+    """
+    Summarize the training distribution of every feature
+
+    Features with few distinct values (and label-encoded categoricals) are kept
+    as value frequencies; the others as a histogram over quantile bin edges.
+
+    Args:
+        X: Encoded training features
+        categorical: Label-encoded columns (unordered, so no KS distance)
+        n_bins: Quantile bins per continuous feature
+        max_discrete: Distinct values up to which a numeric feature is kept as frequencies
+
+    Returns:
+        Dictionary of per-feature summaries, picklable and JSON-serializable
+    """
+    features = {}
+    for col in X.columns:
+        values = X[col].to_numpy(dtype=float)
+        distinct = np.unique(values)
+        if col in categorical or len(distinct) <= max_discrete:
+            # The last bucket collects values never seen in training
+            positions = np.searchsorted(distinct, values)
+            counts = np.bincount(positions, minlength=len(distinct) + 1)
+            features[col] = {
+                "kind": "values",
+                "values": distinct.tolist(),
+                "ordered": col not in categorical,
+                "proportions": (counts / len(values)).tolist()
+            }
+        else:
+            edges = np.unique(np.quantile(values, np.linspace(0, 1, n_bins + 1)[1:-1]))
+            counts = np.bincount(np.searchsorted(edges, values, side='right'),
+                                 minlength=len(edges) + 1)
+            features[col] = {
+                "kind": "bins",
+                "edges": edges.tolist(),
+                "ordered": True,
+                "proportions": (counts / len(values)).tolist()
+            }
+    return {"rows": len(X), "features": features}
+
+
+class DriftMonitor:
+    """
+    Streaming comparison of scored traffic with the training distribution
+
+    Each feature keeps one count per reference bucket, so memory stays constant
+    however much traffic is observed. Every interval_seconds (checked when a
+    prediction is observed) the counts are scored against the reference with
+    PSI and, for ordered features, the KS distance between the binned CDFs;
+    the window then starts over. Windows with fewer than min_samples
+    predictions keep accumulating until they are large enough to score.
+    """
+
+    SMALL_BATCH = 8
+
+    def __init__(self, interval_seconds: float = 300, min_samples: int = 500):
+        self.interval_seconds = interval_seconds
+        self.min_samples = min_samples
+        self.reference = None
+        self.latest = None
+        self._reference_token = object()
+        self._lock = threading.Lock()
+        self._reset_window()
+
+    def set_reference(self, reference: Optional[Dict[str, Any]]):
+        """Compare against a new training distribution (drops the current window)"""
+        with self._lock:
+            self.reference = reference
+            self.latest = None
+            # Identifies observations made against this reference
+            self._reference_token = object()
+            # All features count into one flat array; each owns a slice of it
+            self._layout = []
+            self._size = 0
+            if reference is not None:
+                for col, summary in reference["features"].items():
+                    key = "values" if summary["kind"] == "values" else "edges"
+                    lookup = np.asarray(summary[key], dtype=float)
+                    if summary["kind"] == "values":
+                        index = {value: i for i, value in enumerate(lookup.tolist())}
+                    else:
+                        index = lookup.tolist()
+                    self._layout.append((col, summary["kind"], lookup, index, self._size))
+                    self._size += len(summary["proportions"])
+            self._reset_window()
+
+    def _reset_window(self):
+        self._counts = np.zeros(getattr(self, "_size", 0), dtype=np.int64)
+        self._samples = 0
+        self._window_start = time.time()
+        self._next_evaluation = time.monotonic() + self.interval_seconds
+        drift_window_size.set(0)
+
+    @staticmethod
+    def _buckets(kind: str, lookup: np.ndarray, values: np.ndarray) -> np.ndarray:
+        if kind == "bins":
+            return np.searchsorted(lookup, values, side='right')
+        positions = np.minimum(np.searchsorted(lookup, values), len(lookup) - 1)
+        return np.where(lookup[positions] == values, positions, len(lookup))
+
+    def observe(self, X: pd.DataFrame) -> Optional[tuple]:
+        """
+        Add encoded features of scored transactions to the current window
+
+        Returns:
+            Observation to pass to observe_again when the same rows are scored
+            again from a cache, or None without a reference
+        """
+        if self.reference is None:
+            return None
+
+        # One conversion for all columns; per-column pandas access would cost more
+        # than the counting itself on single-transaction batches
+        columns = {col: i for i, col in enumerate(X.columns)}
+        matrix = X.to_numpy(dtype=float)
+
+        layout = [(entry, columns[entry[0]]) for entry in self._layout if entry[0] in columns]
+        if len(matrix) <= self.SMALL_BATCH:
+            # Plain Python lookups beat a dozen tiny numpy calls per feature
+            buckets = []
+            for row in matrix.tolist():
+                for (_, kind, lookup, index, offset), i in layout:
+                    if kind == "bins":
+                        buckets.append(offset + bisect_right(index, row[i]))
+                    else:
+                        buckets.append(offset + index.get(row[i], len(index)))
+            buckets = tuple(buckets)
+        else:
+            buckets = np.concatenate([self._buckets(kind, lookup, matrix[:, i]) + offset
+                                      for (_, kind, lookup, _, offset), i in layout])
+
+        observation = (self._reference_token, buckets, len(matrix))
+        self.observe_again(observation)
+        return observation
+
+    def observe_again(self, observation: Optional[tuple]):
+        """
+        Count previously observed rows once more (e.g. a prediction served from cache)
+
+        Observations made against an older reference are ignored.
+        """
+        if observation is None:
+            return
+        token, buckets, rows = observation
+        if token is not self._reference_token:
+            return
+
+        if isinstance(buckets, tuple):
+            counts = [0] * self._size
+            for bucket in buckets:
+                counts[bucket] += 1
+        else:
+            counts = np.bincount(buckets, minlength=self._size)
+
+        with self._lock:
+            if token is not self._reference_token:
+                return
+            self._counts += counts
+            self._samples += rows
+            drift_window_size.set(self._samples)
+
+            if time.monotonic() >= self._next_evaluation:
+                if self._samples >= self.min_samples:
+                    self.latest = self._score()
+                    for feature, score in self.latest["features"].items():
+                        feature_psi.set(score["psi"], feature=feature)
+                        if score["ks"] is not None:
+                            feature_ks.set(score["ks"], feature=feature)
+                    self._reset_window()
+                else:
+                    self._next_evaluation = time.monotonic() + self.interval_seconds
+
+    def _score(self) -> Dict[str, Any]:
+        features = {}
+        for col, _, _, _, offset in self._layout:
+            summary = self.reference["features"][col]
+            expected = np.asarray(summary["proportions"])
+            counts = self._counts[offset:offset + len(expected)]
+            actual = counts / max(self._samples, 1)
+
+            p = np.maximum(expected, _EPSILON)
+            q = np.maximum(actual, _EPSILON)
+            psi = float(np.sum((q - p) * np.log(q / p)))
+
+            ks = None
+            if summary["ordered"]:
+                # The unseen-value bucket has no place in the order, so leave it out
+                span = len(expected) if summary["kind"] == "bins" else len(expected) - 1
+                ks = float(np.max(np.abs(np.cumsum(expected[:span]) - np.cumsum(actual[:span]))))
+
+            features[col] = {
+                "psi": psi,
+                "ks": ks,
+                "status": "alert" if psi >= PSI_ALERT else "warning" if psi >= PSI_WARNING else "stable"
+            }
+
+        drifted = sorted((col for col, score in features.items() if score["status"] == "alert"),
+                         key=lambda col: -features[col]["psi"])
+        return {
+            "window_start": self._window_start,
+            "window_end": time.time(),
+            "samples": self._samples,
+            "features": features,
+            "drifted_features": drifted,
+            "retrain_recommended": bool(drifted)
+        }
+
+    def get_report(self) -> Dict[str, Any]:
+        """Latest scheduled scores plus a provisional score of the current window"""
+        with self._lock:
+            current = self._score() if self.reference is not None and self._samples else None
+            return {
+                "reference_rows": self.reference["rows"] if self.reference is not None else 0,
+                "interval_seconds": self.interval_seconds,
+                "min_samples": self.min_samples,
+                "latest": self.latest,
+                "current_window": current
+            }
@@ -2,15 +2,29 @@ import pandas as pd
 import numpy as np
 from typing import List, Dict, Any
 
+import metrics
+
 
 class FraudRuleEngine:
     """
     Hybrid rule-based fraud detection engine for UPI transactions
     """
     
+    # Optimized rule sets may flag at most this multiple of the labeled fraud rate
+    # unless a larger alert budget is requested explicitly, and their precision
+    # must beat the fraud rate by MIN_PRECISION_LIFT to be worth applying
+    MAX_ALERT_RATE_MULTIPLE = 5
+    MIN_PRECISION_LIFT = 1.5
+    
     def __init__(self):
         self.rules = self._define_rules()
-    
+        self.threshold = 0.4
+        self.rules_version = 1
+        metrics.rules_version.set(self.rules_version)
+        self._analytics_cache = {}
+        self._hits_cache = (None, None)
+        self._rule_set = None
+
     def _define_rules(self) -> List[Dict[str, Any]]:
         """Define fraud detection rules"""
         rules = [
@@ -18,61 +32,71 @@ class FraudRuleEngine:
                 "name": "High Amount Transaction",
                 "description": "Transactions above 10,000 INR are flagged",
                 "weight": 0.3,
-                "function": self._rule_high_amount
+                "function": self._rule_high_amount,
+                "vectorized": self._vec_high_amount
             },
             {
                 "name": "Unusual Hour Transaction",
                 "description": "Transactions between 11 PM and 5 AM are suspicious",
                 "weight": 0.2,
-                "function": self._rule_unusual_hour
+                "function": self._rule_unusual_hour,
+                "vectorized": self._vec_unusual_hour
             },
             {
                 "name": "Failed Transaction Pattern",
                 "description": "Failed transactions are more likely to be fraud attempts",
                 "weight": 0.25,
-                "function": self._rule_failed_transaction
+                "function": self._rule_failed_transaction,
+                "vectorized": self._vec_failed_transaction
             },
             {
                 "name": "Cross-State High Value",
                 "description": "High value transactions (>5000) with different sender/receiver states",
                 "weight": 0.25,
-                "function": self._rule_cross_state_high_value
+                "function": self._rule_cross_state_high_value,
+                "vectorized": self._vec_cross_state_high_value
             },
             {
                 "name": "Suspicious Device Type",
                 "description": "Web-based transactions with high amounts are more risky",
                 "weight": 0.15,
-                "function": self._rule_suspicious_device
+                "function": self._rule_suspicious_device,
+                "vectorized": self._vec_suspicious_device
             },
             {
                 "name": "Multiple Small Transactions",
                 "description": "Very small amounts (<50 INR) might be testing transactions",
                 "weight": 0.1,
-                "function": self._rule_very_small_amount
+                "function": self._rule_very_small_amount,
+                "vectorized": self._vec_very_small_amount
             },
             {
                 "name": "Weekend High Value",
                 "description": "High value transactions during weekends",
                 "weight": 0.15,
-                "function": self._rule_weekend_high_value
+                "function": self._rule_weekend_high_value,
+                "vectorized": self._vec_weekend_high_value
             },
             {
                 "name": "Age Group Mismatch",
                 "description": "Transactions between incompatible age groups (e.g., 56+ to 18-25)",
                 "weight": 0.2,
-                "function": self._rule_age_group_mismatch
+                "function": self._rule_age_group_mismatch,
+                "vectorized": self._vec_age_group_mismatch
             },
             {
                 "name": "Rapid Transaction",
                 "description": "P2P transactions with entertainment/shopping category are risky",
                 "weight": 0.15,
-                "function": self._rule_risky_category_combination
+                "function": self._rule_risky_category_combination,
+                "vectorized": self._vec_risky_category_combination
             },
             {
                 "name": "Network Type Anomaly",
                 "description": "3G network with high-value transactions is unusual",
                 "weight": 0.1,
-                "function": self._rule_network_anomaly
+                "function": self._rule_network_anomaly,
+                "vectorized": self._vec_network_anomaly
             }
         ]
         return rules
@@ -152,7 +176,99 @@ class FraudRuleEngine:
         amount = row.get('amount_(inr)', row.get('amount (INR)', 0))
         
         return network == '3G' and amount > 2000
-    
+
+    # Vectorized rule implementations (one boolean per row, same semantics as above)
+    @staticmethod
+    def _column(df: pd.DataFrame, name: str, default: Any) -> pd.Series:
+        """Get a column, or a constant series when the column is missing"""
+        if name in df.columns:
+            return df[name]
+        return pd.Series(default, index=df.index)
+
+    def _amount(self, df: pd.DataFrame) -> pd.Series:
+        """Get the amount column under either its raw or standardized name"""
+        if 'amount_(inr)' in df.columns:
+            return df['amount_(inr)']
+        return self._column(df, 'amount (INR)', 0)
+
+    def _vec_high_amount(self, df: pd.DataFrame) -> pd.Series:
+        return self._amount(df) > 10000
+
+    def _vec_unusual_hour(self, df: pd.DataFrame) -> pd.Series:
+        hour = self._column(df, 'hour_of_day', 12)
+        return (hour >= 23) | (hour < 5)
+
+    def _vec_failed_transaction(self, df: pd.DataFrame) -> pd.Series:
+        return self._column(df, 'transaction_status', 'SUCCESS') != 'SUCCESS'
+
+    def _vec_cross_state_high_value(self, df: pd.DataFrame) -> pd.Series:
+        if 'receiver_state' not in df.columns:
+            return pd.Series(False, index=df.index)
+        # Compare as plain values: categoricals with different categories cannot be compared
+        sender_state = np.asarray(self._column(df, 'sender_state', ''), dtype=object)
+        receiver_state = np.asarray(df['receiver_state'], dtype=object)
+        return (self._amount(df) > 5000) & (sender_state != receiver_state)
+
+    def _vec_suspicious_device(self, df: pd.DataFrame) -> pd.Series:
+        device = self._column(df, 'device_type', 'Android')
+        return (device == 'Web') & (self._amount(df) > 3000)
+
+    def _vec_very_small_amount(self, df: pd.DataFrame) -> pd.Series:
+        return self._amount(df) < 50
+
+    def _vec_weekend_high_value(self, df: pd.DataFrame) -> pd.Series:
+        is_weekend = self._column(df, 'is_weekend', 0)
+        return (is_weekend == 1) & (self._amount(df) > 8000)
+
+    def _vec_age_group_mismatch(self, df: pd.DataFrame) -> pd.Series:
+        sender_age = self._column(df, 'sender_age_group', '')
+        receiver_age = self._column(df, 'receiver_age_group', '')
+        suspicious = (((sender_age == '56+') & (receiver_age == '18-25')) |
+                      ((sender_age == '18-25') & (receiver_age == '56+')))
+        return suspicious & (self._amount(df) > 3000)
+
+    def _vec_risky_category_combination(self, df: pd.DataFrame) -> pd.Series:
+        txn_type = self._column(df, 'transaction_type', '')
+        category = self._column(df, 'merchant_category', '')
+        return ((txn_type == 'P2P') &
+                category.isin(['Entertainment', 'Shopping']) &
+                (self._amount(df) > 5000))
+
+    def _vec_network_anomaly(self, df: pd.DataFrame) -> pd.Series:
+        network = self._column(df, 'network_type', '4G')
+        return (network == '3G') & (self._amount(df) > 2000)
+
+    def compute_rule_hits(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        Evaluate every rule over the whole dataframe
+
+        Args:
+            df: Input dataframe with transaction data
+
+        Returns:
+            Boolean matrix of shape (n_transactions, n_rules), column j is rule j
+        """
+        hits = np.zeros((len(df), len(self.rules)), dtype=bool)
+        for j, rule in enumerate(self.rules):
+            hits[:, j] = np.asarray(rule['vectorized'](df), dtype=bool)
+        return hits
+
+    def get_rule_hits(self, df: pd.DataFrame, data_version: Any = None) -> np.ndarray:
+        """
+        Get the rule-hit matrix, reusing the last one computed for the same data version
+
+        The matrix only depends on the rule conditions, so it stays valid when
+        weights or the threshold change.
+        """
+        cached_version, cached_hits = self._hits_cache
+        if data_version is not None and cached_version == data_version:
+            return cached_hits
+
+        hits = self.compute_rule_hits(df)
+        if data_version is not None:
+            self._hits_cache = (data_version, hits)
+        return hits
+
     def apply_rules(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Apply all fraud detection rules to the dataframe
@@ -163,31 +279,31 @@ class FraudRuleEngine:
         Returns:
             DataFrame with additional columns: rule_score, rule_based_fraud, triggered_rules
         """
-        df = df.copy()
-        
-        # Initialize columns
-        df['rule_score'] = 0.0
-        df['triggered_rules'] = [[] for _ in range(len(df))]
-        
-        # Apply each rule
-        for rule in self.rules:
-            rule_name = rule['name']
-            rule_weight = rule['weight']
-            rule_func = rule['function']
-            
-            # Apply rule to each row
-            for idx, row in df.iterrows():
-                if rule_func(row):
-                    df.at[idx, 'rule_score'] += rule_weight
-                    df.at[idx, 'triggered_rules'].append(rule_name)
-        
-        # Normalize scores to 0-1 range
-        max_possible_score = sum(rule['weight'] for rule in self.rules)
-        df['rule_score'] = df['rule_score'] / max_possible_score
-        
-        # Flag as fraud if score exceeds threshold (0.4)
-        df['rule_based_fraud'] = (df['rule_score'] >= 0.4).astype(int)
-        
+        metrics.batch_size.observe(len(df), stage="rules.apply")
+
+        # Only new columns are added, so the input's columns can be shared
+        df = df.copy(deep=False)
+        with metrics.span("rules.compute_hits"):
+            hits = self.compute_rule_hits(df)
+
+        with metrics.span("rules.score"):
+            rule_names = [rule['name'] for rule in self.rules]
+
+            # Accumulate weights rule by rule so scores match the row-wise evaluation exactly
+            rule_score = np.zeros(len(df))
+            for j, rule in enumerate(self.rules):
+                rule_score += hits[:, j] * rule['weight']
+
+            # Normalize scores to 0-1 range
+            max_possible_score = sum(rule['weight'] for rule in self.rules)
+            df['rule_score'] = rule_score / max_possible_score
+            df['triggered_rules'] = [
+                [rule_names[j] for j in np.flatnonzero(row)] for row in hits
+            ]
+
+            # Flag as fraud if score exceeds threshold
+            df['rule_based_fraud'] = (df['rule_score'] >= self.threshold).astype(int)
+
         return df
     
     def get_rules_description(self) -> List[Dict[str, Any]]:
@@ -225,6 +341,329 @@ class FraudRuleEngine:
         
         return {
             'rule_score': normalized_score,
-            'is_fraud': normalized_score >= 0.4,
+            'is_fraud': normalized_score >= self.threshold,
             'triggered_rules': triggered
         }
+
+    def get_rule_analytics(self, df: pd.DataFrame, data_version: Any = None,
+                           group_by: List[str] = None) -> Dict[str, Any]:
+        """
+        Compute hit rate, precision, recall and lift for every rule
+
+        All statistics come from a single rule-hit matrix; per-group figures are
+        obtained with one sorted segment reduction per grouping column. Results are
+        cached until the data version or the rule set changes.
+
+        Args:
+            df: Labeled dataframe with a fraud_flag column
+            data_version: Version of the data in df (None disables caching)
+            group_by: Columns to break the statistics down by
+
+        Returns:
+            Dictionary with overall and per-group rule statistics, plus the
+            group_by columns missing from df
+        """
+        if 'fraud_flag' not in df.columns:
+            raise ValueError("fraud_flag column not found in dataframe")
+
+        if group_by is None:
+            group_by = ['transaction_type', 'hour_of_day']
+        # Uncleaned data still has raw headers such as 'transaction type'
+        standardized = {str(col).strip().lower().replace(' ', '_'): col for col in df.columns}
+        columns = {col: col if col in df.columns else standardized.get(col) for col in group_by}
+        missing = [col for col, source in columns.items() if source is None]
+        group_by = [col for col in group_by if columns[col] is not None]
+
+        cache_key = (data_version, self.rules_version, tuple(group_by))
+        if data_version is not None and cache_key in self._analytics_cache:
+            return self._analytics_cache[cache_key]
+
+        hits = self.get_rule_hits(df, data_version).astype(np.int64)
+        fraud = df['fraud_flag'].to_numpy(dtype=np.int64)
+
+        analytics = {
+            **self._rule_stats(hits.sum(axis=0), fraud @ hits, len(df), int(fraud.sum())),
+            "breakdown": {},
+            "missing_groups": missing
+        }
+
+        for col in group_by:
+            codes, labels = pd.factorize(df[columns[col]], sort=True)
+            order = np.argsort(codes, kind='stable')
+            sorted_codes = codes[order]
+            valid = sorted_codes >= 0
+            order, sorted_codes = order[valid], sorted_codes[valid]
+            if len(order) == 0:
+                analytics["breakdown"][col] = {}
+                continue
+
+            # Segment boundaries of each group in the sorted order
+            starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+            sorted_hits = hits[order]
+            sorted_fraud = fraud[order]
+            group_hits = np.add.reduceat(sorted_hits, starts, axis=0)
+            group_true_positives = np.add.reduceat(sorted_hits * sorted_fraud[:, None], starts, axis=0)
+            group_sizes = np.diff(np.r_[starts, len(order)])
+            group_fraud = np.add.reduceat(sorted_fraud, starts)
+
+            analytics["breakdown"][col] = {
+                str(labels[sorted_codes[start]]): self._rule_stats(
+                    group_hits[g], group_true_positives[g], int(group_sizes[g]), int(group_fraud[g])
+                )
+                for g, start in enumerate(starts)
+            }
+
+        if data_version is not None:
+            self._analytics_cache = {cache_key: analytics}
+        return analytics
+
+    def _rule_stats(self, hits: np.ndarray, true_positives: np.ndarray,
+                    total: int, fraud_total: int) -> Dict[str, Any]:
+        """Turn per-rule hit and true-positive counts into rate statistics"""
+        base_rate = fraud_total / total if total else 0.0
+        rules = []
+        for j, rule in enumerate(self.rules):
+            rule_hits = int(hits[j])
+            rule_tp = int(true_positives[j])
+            precision = rule_tp / rule_hits if rule_hits else 0.0
+            rules.append({
+                "name": rule['name'],
+                "weight": rule['weight'],
+                "hits": rule_hits,
+                "true_positives": rule_tp,
+                "hit_rate": rule_hits / total if total else 0.0,
+                "precision": precision,
+                "recall": rule_tp / fraud_total if fraud_total else 0.0,
+                "lift": precision / base_rate if base_rate else 0.0
+            })
+
+        return {
+            "total_transactions": total,
+            "fraud_transactions": fraud_total,
+            "base_fraud_rate": base_rate,
+            "rules": rules
+        }
+
+    def get_rule_set(self) -> Dict[str, Any]:
+        """
+        Version, weights and threshold of the active rule set
+
+        The dictionary is rebuilt when the rule set changes and never modified,
+        so callers may hold on to it (e.g. in queued audit records).
+        """
+        if self._rule_set is None or self._rule_set['version'] != self.rules_version:
+            self._rule_set = {
+                "version": self.rules_version,
+                "weights": {rule['name']: rule['weight'] for rule in self.rules},
+                "threshold": self.threshold
+            }
+        return self._rule_set
+
+    def set_rule_weights(self, weights: Dict[str, float], threshold: float = None):
+        """
+        Replace rule weights and optionally the fraud threshold
+
+        Args:
+            weights: Mapping of rule name to new weight
+            threshold: New threshold on the normalized rule score
+        """
+        rule_names = {rule['name'] for rule in self.rules}
+        unknown = sorted(set(weights) - rule_names)
+        if unknown:
+            raise ValueError(f"Unknown rules: {', '.join(unknown)}")
+        if any(weight < 0 for weight in weights.values()):
+            raise ValueError("Rule weights must be non-negative")
+        new_weights = {rule['name']: float(weights.get(rule['name'], rule['weight']))
+                       for rule in self.rules}
+        if sum(new_weights.values()) <= 0:
+            raise ValueError("At least one rule weight must be positive")
+        if threshold is not None and not 0 < threshold <= 1:
+            raise ValueError("threshold must be in (0, 1]")
+
+        # Only mutate once everything is validated
+        for rule in self.rules:
+            rule['weight'] = new_weights[rule['name']]
+        if threshold is not None:
+            self.threshold = float(threshold)
+
+        self.rules_version += 1
+        metrics.rules_version.set(self.rules_version)
+        self._analytics_cache = {}
+
+    def optimize_weights(self, df: pd.DataFrame, objective: str = 'f1',
+                         alert_budget: float = None, n_candidates: int = 2000,
+                         n_rounds: int = 4, data_version: Any = None,
+                         random_state: int = 42, max_alert_rate: float = None) -> Dict[str, Any]:
+        """
+        Search rule weights and the threshold against the fraud_flag labels
+
+        Transactions are collapsed into their distinct rule-hit patterns (at most
+        2^n_rules of them), so each batch of candidate weight vectors is scored with
+        a single matrix product and an exact threshold sweep, without re-running
+        the rules.
+
+        Args:
+            df: Labeled dataframe with a fraud_flag column
+            objective: 'f1' for the best F1, 'recall_at_budget' for the best recall
+                flagging at most alert_budget of all transactions
+            alert_budget: Maximum fraction of transactions to flag (0-1)
+            max_alert_rate: Cap on the flagged fraction for the 'f1' objective
+                (default MAX_ALERT_RATE_MULTIPLE times the labeled fraud rate)
+            n_candidates: Total number of candidate weight vectors to evaluate
+            n_rounds: Search rounds; later rounds refine around the best candidate
+            data_version: Version of the data in df, used to reuse the hit matrix
+            random_state: Random seed
+
+        Returns:
+            Dictionary with the optimized weights, threshold and metrics, the
+            metrics of the current rule set for comparison, and whether the
+            result is safe to apply (with the reasons when it is not)
+        """
+        if 'fraud_flag' not in df.columns:
+            raise ValueError("fraud_flag column not found in dataframe")
+        if objective not in ('f1', 'recall_at_budget'):
+            raise ValueError("objective must be 'f1' or 'recall_at_budget'")
+        if objective == 'recall_at_budget' and not (alert_budget and 0 < alert_budget <= 1):
+            raise ValueError("alert_budget must be a fraction between 0 and 1")
+        if max_alert_rate is not None and not 0 < max_alert_rate <= 1:
+            raise ValueError("max_alert_rate must be a fraction between 0 and 1")
+
+        hits = self.get_rule_hits(df, data_version)
+        fraud = df['fraud_flag'].to_numpy(dtype=np.int64)
+        if not fraud.any():
+            raise ValueError("No fraudulent transactions in fraud_flag to optimize against")
+        fraud_rate = float(fraud.mean())
+        if objective == 'recall_at_budget':
+            max_alert_rate = alert_budget
+        elif max_alert_rate is None:
+            max_alert_rate = min(1.0, self.MAX_ALERT_RATE_MULTIPLE * fraud_rate)
+
+        # Collapse identical hit patterns into (pattern, fraud count, legit count)
+        patterns, inverse = np.unique(hits, axis=0, return_inverse=True)
+        inverse = inverse.ravel()
+        positives = np.bincount(inverse, weights=fraud, minlength=len(patterns))
+        negatives = np.bincount(inverse, minlength=len(patterns)) - positives
+        patterns = patterns.astype(float)
+        max_alerts = max_alert_rate * len(df)
+
+        current = np.array([rule['weight'] for rule in self.rules])
+        current = current / current.sum()
+        baseline = self._pattern_metrics(patterns @ current >= self.threshold,
+                                         positives, negatives)
+
+        rng = np.random.default_rng(random_state)
+        per_round = max(1, n_candidates // max(1, n_rounds))
+        best_weights = current
+        best_value, best_threshold = self._best_threshold(
+            patterns, positives, negatives, current[:, None], objective, max_alerts
+        )[1:]
+        evaluated = 1
+
+        for round_idx in range(max(1, n_rounds)):
+            if round_idx == 0:
+                candidates = rng.random((len(self.rules), per_round))
+            else:
+                spread = 0.5 ** round_idx * best_weights.max()
+                noise = rng.normal(0.0, spread, (len(self.rules), per_round))
+                candidates = np.clip(best_weights[:, None] + noise, 0.0, None)
+            totals = candidates.sum(axis=0)
+            candidates = candidates[:, totals > 0] / totals[totals > 0]
+            if candidates.shape[1] == 0:
+                continue
+
+            index, value, threshold = self._best_threshold(
+                patterns, positives, negatives, candidates, objective, max_alerts
+            )
+            evaluated += candidates.shape[1]
+            if value > best_value:
+                best_value, best_threshold = value, threshold
+                best_weights = candidates[:, index]
+
+        optimized = self._pattern_metrics(patterns @ best_weights >= best_threshold,
+                                          positives, negatives)
+
+        warnings = []
+        if optimized['alerts'] == 0:
+            warnings.append(f"No rule set flags anything within the {max_alert_rate:.2%} alert rate limit")
+        elif optimized['alert_rate'] > max_alert_rate:
+            warnings.append(f"Flags {optimized['alert_rate']:.2%} of transactions, "
+                            f"above the {max_alert_rate:.2%} limit")
+        elif optimized['precision'] < self.MIN_PRECISION_LIFT * fraud_rate:
+            warnings.append(f"Precision {optimized['precision']:.2%} is not meaningfully above "
+                            f"the {fraud_rate:.2%} fraud rate; the rules do not separate fraud")
+
+        return {
+            "objective": objective,
+            "alert_budget": alert_budget,
+            "fraud_rate": fraud_rate,
+            "max_alert_rate": max_alert_rate,
+            "acceptable": not warnings,
+            "warnings": warnings,
+            "candidates_evaluated": evaluated,
+            "threshold": float(best_threshold),
+            "weights": {
+                rule['name']: float(weight) for rule, weight in zip(self.rules, best_weights)
+            },
+            "metrics": optimized,
+            "baseline_metrics": baseline
+        }
+
+    @staticmethod
+    def _best_threshold(patterns: np.ndarray, positives: np.ndarray, negatives: np.ndarray,
+                        candidates: np.ndarray, objective: str, max_alerts: float):
+        """
+        Find the best candidate and threshold for a batch of weight vectors
+
+        Only cuts that flag at most max_alerts transactions are considered; the
+        cut that flags every transaction never is.
+
+        Returns:
+            Tuple of (candidate index, objective value, threshold)
+        """
+        scores = patterns @ candidates
+        order = np.argsort(-scores, axis=0, kind='stable')
+        sorted_scores = np.take_along_axis(scores, order, axis=0)
+        true_positives = np.cumsum(positives[order], axis=0)
+        false_positives = np.cumsum(negatives[order], axis=0)
+        fraud_total = positives.sum()
+
+        # Only cut between distinct scores, otherwise the threshold cannot realize the cut
+        valid = np.zeros_like(sorted_scores, dtype=bool)
+        valid[:-1] = ~np.isclose(sorted_scores[:-1], sorted_scores[1:])
+        valid &= (true_positives + false_positives) <= max_alerts
+
+        if objective == 'f1':
+            value = 2 * true_positives / (true_positives + false_positives + fraud_total)
+        else:
+            value = true_positives / fraud_total if fraud_total else np.zeros_like(sorted_scores)
+        value = np.where(valid, value, -np.inf)
+
+        cut, index = np.unravel_index(np.argmax(value), value.shape)
+        if not np.isfinite(value[cut, index]):
+            # Nothing fits the budget: flag nothing
+            return index, 0.0, float(sorted_scores[0, index]) + 1.0
+
+        # The last cut is never valid, so there always is a lower score to cut above
+        threshold = (sorted_scores[cut, index] + sorted_scores[cut + 1, index]) / 2
+        return index, float(value[cut, index]), float(threshold)
+
+    @staticmethod
+    def _pattern_metrics(flagged: np.ndarray, positives: np.ndarray,
+                         negatives: np.ndarray) -> Dict[str, Any]:
+        """Precision, recall, F1 and alert volume of a flagged pattern mask"""
+        true_positives = float(positives[flagged].sum())
+        alerts = true_positives + float(negatives[flagged].sum())
+        fraud_total = float(positives.sum())
+        total = fraud_total + float(negatives.sum())
+
+        precision = true_positives / alerts if alerts else 0.0
+        recall = true_positives / fraud_total if fraud_total else 0.0
+        f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+
+        return {
+            "precision": precision,
+            "recall": recall,
+            "f1_score": f1,
+            "alerts": int(alerts),
+            "alert_rate": alerts / total if total else 0.0
+        }
@@ -0,0 +1,154 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+
+TRANSACTION_TYPES = {"P2P": 0.45, "P2M": 0.35, "Bill Payment": 0.12, "Recharge": 0.08}
+
+# Category -> (probability, median amount in INR)
+MERCHANT_CATEGORIES = {
+    "Grocery": (0.20, 600),
+    "Food": (0.18, 350),
+    "Shopping": (0.15, 1800),
+    "Fuel": (0.10, 1200),
+    "Utilities": (0.09, 1500),
+    "Entertainment": (0.08, 900),
+    "Transport": (0.08, 400),
+    "Healthcare": (0.05, 2000),
+    "Education": (0.04, 5000),
+    "Other": (0.03, 1000),
+}
+
+AGE_GROUPS = {"18-25": 0.25, "26-35": 0.35, "36-45": 0.22, "46-55": 0.12, "56+": 0.06}
+
+STATES = {
+    "Maharashtra": 0.15, "Uttar Pradesh": 0.12, "Karnataka": 0.10, "Tamil Nadu": 0.10,
+    "Delhi": 0.09, "Telangana": 0.08, "Gujarat": 0.08, "Rajasthan": 0.07,
+    "West Bengal": 0.07, "Andhra Pradesh": 0.06, "Kerala": 0.04, "Punjab": 0.04,
+}
+
+BANKS = {
+    "SBI": 0.25, "HDFC": 0.17, "ICICI": 0.15, "Axis": 0.12, "PNB": 0.10,
+    "Kotak": 0.08, "IndusInd": 0.07, "Yes Bank": 0.06,
+}
+
+DEVICE_TYPES = {"Android": 0.75, "iOS": 0.20, "Web": 0.05}
+
+NETWORK_TYPES = {"4G": 0.60, "5G": 0.25, "WiFi": 0.10, "3G": 0.05}
+
+# Transactions per hour of day, peaking in the evening and quiet at night
+HOURLY_PROFILE = np.array([
+    1, 0.6, 0.4, 0.3, 0.3, 0.5, 1.2, 2.5, 4, 5, 5.5, 6,
+    6.5, 6, 5.5, 5.5, 6, 6.5, 7, 7.5, 7, 5.5, 3.5, 2
+])
+
+
+def _choice(rng: np.random.Generator, options: dict, size: int) -> np.ndarray:
+    """Sample from a {value: probability} mapping"""
+    values = list(options)
+    probabilities = np.array([options[value] for value in values], dtype=float)
+    return rng.choice(values, size=size, p=probabilities / probabilities.sum())
+
+
+def generate_transactions(n_rows: int, fraud_rate: float = 0.002,
+                          year: int = 2024, random_state: int = 42) -> pd.DataFrame:
+    """
+    Generate synthetic UPI transactions shaped like upi_transactions_2024.csv
+
+    Fraud labels are assigned to exactly round(n_rows * fraud_rate) transactions,
+    sampled with higher probability for risk factors the rule engine looks at
+    (night hours, large amounts, web devices, 3G networks, failed status).
+
+    Args:
+        n_rows: Number of transactions to generate
+        fraud_rate: Fraction of transactions labeled as fraud (0-1)
+        year: Year of the generated timestamps
+        random_state: Random seed
+
+    Returns:
+        DataFrame with the raw dataset columns
+    """
+    if n_rows <= 0:
+        raise ValueError("n_rows must be positive")
+    if not 0 <= fraud_rate <= 1:
+        raise ValueError("fraud_rate must be between 0 and 1")
+
+    rng = np.random.default_rng(random_state)
+
+    # Timestamps: uniform day of year, realistic hour of day
+    start = pd.Timestamp(year=year, month=1, day=1)
+    days = pd.Timestamp(year=year + 1, month=1, day=1) - start
+    day_offsets = rng.integers(0, days.days, n_rows)
+    hours = rng.choice(24, size=n_rows, p=HOURLY_PROFILE / HOURLY_PROFILE.sum())
+    seconds = rng.integers(0, 3600, n_rows)
+    timestamps = start + pd.to_timedelta(day_offsets * 86400 + hours * 3600 + seconds, unit='s')
+
+    categories = _choice(rng, {name: p for name, (p, _) in MERCHANT_CATEGORIES.items()}, n_rows)
+    medians = pd.Series(categories).map(
+        {name: median for name, (_, median) in MERCHANT_CATEGORIES.items()}
+    ).to_numpy()
+    amounts = np.round(np.clip(medians * rng.lognormal(0.0, 1.0, n_rows), 1, 100000), 2)
+
+    transaction_types = _choice(rng, TRANSACTION_TYPES, n_rows)
+    statuses = np.where(rng.random(n_rows) < 0.95, 'SUCCESS', 'FAILED')
+    device_types = _choice(rng, DEVICE_TYPES, n_rows)
+    network_types = _choice(rng, NETWORK_TYPES, n_rows)
+    day_of_week = timestamps.dayofweek
+
+    # Relative fraud propensity from the same signals the rule engine uses
+    risk = np.ones(n_rows)
+    risk *= np.where((hours >= 23) | (hours < 5), 3.0, 1.0)
+    risk *= np.where(amounts > 10000, 4.0, np.where(amounts > 5000, 2.0, 1.0))
+    risk *= np.where(device_types == 'Web', 2.5, 1.0)
+    risk *= np.where(network_types == '3G', 1.5, 1.0)
+    risk *= np.where(statuses == 'FAILED', 3.0, 1.0)
+
+    fraud_flag = np.zeros(n_rows, dtype=int)
+    n_fraud = int(round(n_rows * fraud_rate))
+    if n_fraud:
+        fraud_idx = rng.choice(n_rows, size=n_fraud, replace=False, p=risk / risk.sum())
+        fraud_flag[fraud_idx] = 1
+
+    return pd.DataFrame({
+        'transaction_id': [f"TXN{i:010d}" for i in range(1, n_rows + 1)],
+        'timestamp': timestamps.strftime('%Y-%m-%d %H:%M:%S'),
+        'transaction type': transaction_types,
+        'merchant_category': categories,
+        'amount (INR)': amounts,
+        'transaction_status': statuses,
+        'sender_age_group': _choice(rng, AGE_GROUPS, n_rows),
+        'receiver_age_group': _choice(rng, AGE_GROUPS, n_rows),
+        'sender_state': _choice(rng, STATES, n_rows),
+        'sender_bank': _choice(rng, BANKS, n_rows),
+        'receiver_bank': _choice(rng, BANKS, n_rows),
+        'device_type': device_types,
+        'network_type': network_types,
+        'fraud_flag': fraud_flag,
+        'hour_of_day': hours,
+        'day_of_week': timestamps.day_name(),
+        'is_weekend': (day_of_week >= 5).astype(int),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic UPI transaction data")
+    parser.add_argument("--rows", type=int, default=250000, help="Number of transactions")
+    parser.add_argument("--fraud-rate", type=float, default=0.002, help="Fraction labeled as fraud")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument(
+        "--output",
+        default=os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                             "synthetic_upi_transactions.csv"),
+        help="Output CSV path (never the real upi_transactions_2024.csv by default)"
+    )
+    args = parser.parse_args()
+
+    df = generate_transactions(args.rows, fraud_rate=args.fraud_rate, random_state=args.seed)
+    df.to_csv(args.output, index=False)
+    print(f"Wrote {len(df)} transactions ({int(df['fraud_flag'].sum())} fraud) to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
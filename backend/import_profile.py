@@ -0,0 +1,109 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime
+from typing import Any, Dict, List
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Modules that must only be imported once training or model loading is requested
+DEFERRED_MODULES = ("sklearn", "xgboost", "joblib", "scipy")
+
+
+def _parse_importtime(stderr: str) -> List[Dict[str, Any]]:
+    """Parse `python -X importtime` output into per-module timing records"""
+    records = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        records.append({
+            "module": name.strip(),
+            "depth": (len(name) - len(name.lstrip()) - 1) // 2,
+            "self_ms": int(self_us) / 1000,
+            "cumulative_ms": int(cumulative_us) / 1000
+        })
+    return records
+
+
+def profile_import(module: str = "main", runs: int = 5, top: int = 15) -> Dict[str, Any]:
+    """
+    Profile the import of a backend module in fresh interpreters
+
+    Args:
+        module: Module to import
+        runs: Number of fresh interpreters; the median run is reported
+        top: Number of slowest top-level imports to report
+
+    Returns:
+        Dictionary with total import time, slowest imports and deferred-module violations
+    """
+    profiles = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=BACKEND_DIR, capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"Importing {module} failed:\n{result.stderr}")
+        records = _parse_importtime(result.stderr)
+        total = next(r["cumulative_ms"] for r in reversed(records) if r["module"] == module)
+        profiles.append((total, records))
+
+    profiles.sort(key=lambda profile: profile[0])
+    total, records = profiles[len(profiles) // 2]
+    imported = {record["module"].split(".")[0] for record in records}
+
+    # Direct dependencies of the profiled module, by cumulative cost
+    module_depth = next(r["depth"] for r in records if r["module"] == module)
+    direct = [r for r in records if r["depth"] == module_depth + 1]
+    direct.sort(key=lambda record: record["cumulative_ms"], reverse=True)
+
+    return {
+        "module": module,
+        "runs": runs,
+        "median_total_ms": total,
+        "all_totals_ms": [profile[0] for profile in profiles],
+        "modules_imported": len(records),
+        "slowest_imports": direct[:top],
+        "deferred_modules_imported": sorted(set(DEFERRED_MODULES) & imported)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile the API's import time")
+    parser.add_argument("--module", default="main", help="Module to import")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to run")
+    parser.add_argument("--budget-ms", type=float, help="Fail when the median import exceeds this")
+    parser.add_argument("--output-dir", default=os.path.join(BACKEND_DIR, "benchmark_results"))
+    args = parser.parse_args()
+
+    report = profile_import(args.module, runs=args.runs)
+    report["timestamp"] = datetime.now().isoformat(timespec="seconds")
+    report["budget_ms"] = args.budget_ms
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    output_path = os.path.join(args.output_dir,
+                               f"import-profile-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    with open(output_path, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print(f"import {report['module']}: {report['median_total_ms']:.0f} ms (median of {report['runs']})")
+    for record in report["slowest_imports"]:
+        print(f"  {record['cumulative_ms']:8.1f} ms  {record['module']}")
+    print(f"Results written to {output_path}")
+
+    failures = []
+    if report["deferred_modules_imported"]:
+        failures.append("imported at startup: " + ", ".join(report["deferred_modules_imported"]))
+    if args.budget_ms is not None and report["median_total_ms"] > args.budget_ms:
+        failures.append(f"median import {report['median_total_ms']:.0f} ms exceeds {args.budget_ms:.0f} ms")
+    if failures:
+        print("Import profile regression: " + "; ".join(failures))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
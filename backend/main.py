@@ -1,16 +1,21 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel
-from typing import List, Dict, Optional
+from typing import Any, List, Dict, Optional
 import pandas as pd
-import numpy as np
-from datetime import datetime
-import joblib
 import os
+import time
 
 from data_processor import DataProcessor
 from fraud_rules import FraudRuleEngine
 from ml_model import FraudMLModel
+from memory_report import MemoryReport
+import metrics
+from prediction_cache import PredictionCache
+from shared_state import SharedState
+from audit_log import AuditLog
+from drift_monitor import DriftMonitor
 
 app = FastAPI(title="UPI Fraud Detection API", version="1.0.0")
 
@@ -26,12 +31,101 @@ app.add_middleware(
 # Initialize components
 data_processor = DataProcessor()
 rule_engine = FraudRuleEngine()
-ml_model = FraudMLModel()
+ml_model = FraudMLModel(
+    model_dir=os.environ.get("FRAUD_MODEL_DIR"),
+    drift_monitor=DriftMonitor(
+        interval_seconds=float(os.environ.get("FRAUD_DRIFT_INTERVAL", "300")),
+        min_samples=int(os.environ.get("FRAUD_DRIFT_MIN_SAMPLES", "500"))
+    )
+)
+prediction_cache = PredictionCache(
+    max_entries=int(os.environ.get("FRAUD_CACHE_SIZE", "10000")),
+    ttl_seconds=float(os.environ.get("FRAUD_CACHE_TTL", "300"))
+)
+memory_report = MemoryReport(enabled=os.environ.get("FRAUD_MEMORY_REPORT") == "1")
+
+# Every /predict decision is appended to the audit log (FRAUD_AUDIT_LOG=0 disables it)
+audit_log = AuditLog(
+    os.environ.get("FRAUD_AUDIT_DIR", os.path.join(os.path.dirname(__file__), "audit_log")),
+    max_queue=int(os.environ.get("FRAUD_AUDIT_QUEUE", "10000"))
+) if os.environ.get("FRAUD_AUDIT_LOG", "1") != "0" else None
 
 # Global state
 data_loaded = False
 model_trained = False
 
+# Multi-worker mode: workers share data, model and rules through this directory
+shared_state = SharedState(os.environ["FRAUD_SHARED_DIR"]) if os.environ.get("FRAUD_SHARED_DIR") else None
+
+
+def sync_shared_state():
+    """Pick up data, model and rule versions published by other workers"""
+    global data_loaded, model_trained
+    state = shared_state.poll()
+    if not state:
+        return
+
+    data = state.get("data")
+    if data and data["version"] != shared_state.applied["data"]:
+        df, object_columns = shared_state.load_data(data)
+        data_processor.load_shared(df, object_columns, data.get("cleaning_report", {}))
+        data_loaded = True
+        shared_state.applied["data"] = data["version"]
+
+    model = state.get("model")
+    if model and model["version"] != shared_state.applied["model"]:
+        ml_model.load_model(model["path"])
+        ml_model.metrics = model.get("metrics", {})
+        model_trained = True
+        shared_state.applied["model"] = model["version"]
+
+    rules = state.get("rules")
+    if rules and rules["version"] != shared_state.applied["rules"]:
+        rule_engine.set_rule_weights(rules["weights"], rules["threshold"])
+        shared_state.applied["rules"] = rules["version"]
+
+
+
+def audit_versions(versions: tuple) -> Dict[str, int]:
+    """
+    Versions an audit record refers to
+
+    Local counters differ between workers, so with shared state the versions
+    published in the shared directory are recorded instead.
+    """
+    if shared_state is not None:
+        return {"model": shared_state.applied["model"] if versions[0] else 0,
+                "rules": shared_state.applied["rules"]}
+    return {"model": versions[0], "rules": versions[1]}
+
+@app.middleware("http")
+async def track_memory(request: Request, call_next):
+    """Record the peak memory of each request when FRAUD_MEMORY_REPORT=1"""
+    if not memory_report.enabled:
+        return await call_next(request)
+    with memory_report.track(f"{request.method} {request.url.path}"):
+        return await call_next(request)
+
+
+@app.middleware("http")
+async def track_requests(request: Request, call_next):
+    """Count requests and record their latency per route"""
+    start = time.perf_counter()
+    response = await call_next(request)
+    route = request.scope.get("route")
+    path = route.path if route is not None else "unmatched"
+    metrics.http_duration.observe(time.perf_counter() - start, path=path)
+    metrics.http_requests.inc(method=request.method, path=path, status=response.status_code)
+    return response
+
+
+@app.middleware("http")
+async def sync_workers(request: Request, call_next):
+    """Bring this worker up to date with the shared state before handling a request"""
+    if shared_state is not None:
+        sync_shared_state()
+    return await call_next(request)
+
 
 class TransactionInput(BaseModel):
     transaction_type: str
@@ -57,6 +151,16 @@ class PredictionResponse(BaseModel):
     final_prediction: bool
     triggered_rules: List[str]
     risk_level: str
+    feature_contributions: Optional[List[Dict[str, Any]]] = None
+
+
+class RuleOptimizationRequest(BaseModel):
+    objective: str = "f1"
+    alert_budget: Optional[float] = None
+    n_candidates: int = 2000
+    max_alert_rate: Optional[float] = None
+    apply: bool = False
+    retrain_model: bool = False
 
 
 @app.get("/")
@@ -64,7 +168,7 @@ async def root():
     return {
         "message": "UPI Fraud Detection API",
         "version": "1.0.0",
-        "endpoints": ["/load-data", "/clean-data", "/train-model", "/predict", "/stats"]
+        "endpoints": ["/load-data", "/clean-data", "/rule-analytics", "/optimize-rules", "/train-model", "/predict", "/feature-importance", "/drift", "/stats", "/metrics"]
     }
 
 
@@ -73,9 +177,13 @@ async def load_data():
     """Load and process the CSV data"""
     global data_loaded
     try:
-        csv_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "upi_transactions_2024.csv")
+        csv_path = os.environ.get("FRAUD_DATA_PATH") or os.path.join(
+            os.path.dirname(os.path.dirname(__file__)), "upi_transactions_2024.csv"
+        )
         data_processor.load_data(csv_path)
         data_loaded = True
+        if shared_state is not None:
+            shared_state.publish_data(data_processor.get_data(), {})
         
         stats = data_processor.get_data_stats()
         return {
@@ -96,6 +204,8 @@ async def clean_data():
     
     try:
         cleaning_report = data_processor.clean_data()
+        if shared_state is not None:
+            shared_state.publish_data(data_processor.get_data(), cleaning_report)
         return {
             "status": "success",
             "message": "Data cleaned successfully",
@@ -139,6 +249,83 @@ async def apply_rules():
         raise HTTPException(status_code=500, detail=f"Error applying rules: {str(e)}")
 
 
+@app.get("/rule-analytics")
+async def rule_analytics():
+    """Get hit rate, precision, recall and lift of every rule, overall and per group"""
+    global data_loaded
+    if not data_loaded:
+        raise HTTPException(status_code=400, detail="Data not loaded. Please load data first.")
+
+    try:
+        df = data_processor.get_data()
+        analytics = rule_engine.get_rule_analytics(df, data_version=data_processor.data_version)
+
+        return {
+            "status": "success",
+            "analytics": analytics
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error computing rule analytics: {str(e)}")
+
+
+@app.post("/optimize-rules")
+async def optimize_rules(request: Optional[RuleOptimizationRequest] = None):
+    """Optimize rule weights and the fraud threshold against the labeled data"""
+    global data_loaded
+    if not data_loaded:
+        raise HTTPException(status_code=400, detail="Data not loaded. Please load data first.")
+
+    request = request or RuleOptimizationRequest()
+    try:
+        df = data_processor.get_data()
+        result = rule_engine.optimize_weights(
+            df,
+            objective=request.objective,
+            alert_budget=request.alert_budget,
+            n_candidates=request.n_candidates,
+            data_version=data_processor.data_version,
+            max_alert_rate=request.max_alert_rate
+        )
+
+        applied = False
+        model_metrics = None
+        warnings = list(result['warnings'])
+        if request.apply and not result['acceptable']:
+            warnings.append("Rule set not applied")
+        elif request.apply and model_trained and not request.retrain_model:
+            # rule_score and rule_based_fraud are model features: new weights would
+            # feed the trained model inputs it never saw
+            warnings.append("Rule set not applied: the trained model uses rule_score and "
+                            "rule_based_fraud as features; set retrain_model to apply it and retrain")
+        elif request.apply:
+            rule_engine.set_rule_weights(result['weights'], result['threshold'])
+            if shared_state is not None:
+                shared_state.publish_rules(rule_engine)
+            applied = True
+            if model_trained:
+                model_metrics = ml_model.train(rule_engine.apply_rules(df))
+                if shared_state is not None:
+                    shared_state.publish_model(ml_model)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error optimizing rules: {str(e)}")
+
+    if applied:
+        message = "Rule set optimized and applied" + (", model retrained" if model_metrics else "")
+    else:
+        message = "Rule set optimized"
+
+    return {
+        "status": "success",
+        "message": message,
+        "applied": applied,
+        "warnings": warnings,
+        "result": result,
+        "model_metrics": model_metrics
+    }
+
+
 @app.post("/train-model")
 async def train_model():
     """Train the XGBoost fraud detection model"""
@@ -155,6 +342,8 @@ async def train_model():
         # Train model
         metrics = ml_model.train(df_with_rules)
         model_trained = True
+        if shared_state is not None:
+            shared_state.publish_model(ml_model)
         
         return {
             "status": "success",
@@ -166,32 +355,65 @@ async def train_model():
 
 
 @app.post("/predict")
-async def predict(transaction: TransactionInput):
-    """Predict fraud for a single transaction"""
+async def predict(transaction: TransactionInput, explain: bool = False, top_k: int = Query(5, ge=1)):
+    """Predict fraud for a single transaction, optionally explaining the ML score"""
     global model_trained
     
     try:
-        # Convert to DataFrame
         transaction_dict = transaction.model_dump()
-        df = pd.DataFrame([transaction_dict])
 
-        # Map API 'amount' field to standardized 'amount_(inr)' feature
-        # used throughout data processing and model training
-        if 'amount' in df.columns and 'amount_(inr)' not in df.columns:
-            df['amount_(inr)'] = df['amount']
+        # Identical inputs score identically until the model or rules change
+        cache_key = prediction_cache.make_key(transaction_dict) + ((top_k if explain else 0),)
+        versions = (ml_model.model_version if model_trained else 0, rule_engine.rules_version)
+        cached = prediction_cache.get(cache_key, versions)
+        if cached is not None:
+            response, drift_observation = cached
+            for rule_name in response.triggered_rules:
+                metrics.rule_hits.inc(rule=rule_name)
+            # Repeated transactions are part of the live distribution too
+            ml_model.drift_monitor.observe_again(drift_observation)
+            if audit_log is not None:
+                await audit_log.record_async(transaction_dict, response,
+                                             audit_versions(versions),
+                                             rule_set=rule_engine.get_rule_set(), cached=True)
+            return response
+
+        # Convert to DataFrame
+        with metrics.span("predict.build_frame"):
+            df = pd.DataFrame([transaction_dict])
+
+            # Map API 'amount' field to standardized 'amount_(inr)' feature
+            # used throughout data processing and model training
+            if 'amount' in df.columns and 'amount_(inr)' not in df.columns:
+                df['amount_(inr)'] = df['amount']
         
         # Apply rule-based detection
-        rule_result = rule_engine.apply_rules(df)
+        with metrics.span("predict.rules"):
+            rule_result = rule_engine.apply_rules(df)
         rule_based_fraud = bool(rule_result['rule_based_fraud'].iloc[0])
         rule_score = float(rule_result['rule_score'].iloc[0])
         triggered_rules = rule_result['triggered_rules'].iloc[0]
+        for rule_name in triggered_rules:
+            metrics.rule_hits.inc(rule=rule_name)
         
         # ML-based prediction
         ml_fraud_prob = 0.0
         ml_fraud_pred = False
+        feature_contributions = None
+        drift_observations = []
         
         if model_trained:
-            ml_fraud_prob = float(ml_model.predict_proba(rule_result)[0])
+            with metrics.span("predict.model"):
+                if explain:
+                    probabilities, explanations = ml_model.predict_proba_with_contributions(
+                        rule_result, top_k=top_k, drift_observations=drift_observations
+                    )
+                    ml_fraud_prob = float(probabilities[0])
+                    feature_contributions = explanations[0]
+                else:
+                    ml_fraud_prob = float(ml_model.predict_proba(
+                        rule_result, drift_observations=drift_observations
+                    )[0])
             ml_fraud_pred = ml_fraud_prob > 0.5
         
         # Hybrid decision
@@ -206,19 +428,66 @@ async def predict(transaction: TransactionInput):
         else:
             risk_level = "LOW"
         
-        return PredictionResponse(
+        response = PredictionResponse(
             rule_based_fraud=rule_based_fraud,
             rule_based_score=rule_score,
             ml_fraud_probability=ml_fraud_prob,
             ml_fraud_prediction=ml_fraud_pred,
             final_prediction=final_prediction,
             triggered_rules=triggered_rules,
-            risk_level=risk_level
+            risk_level=risk_level,
+            feature_contributions=feature_contributions
         )
+        prediction_cache.put(cache_key, versions,
+                             (response, drift_observations[0] if drift_observations else None))
+        if audit_log is not None:
+            await audit_log.record_async(transaction_dict, response,
+                                         audit_versions(versions),
+                                         rule_set=rule_engine.get_rule_set())
+        return response
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error making prediction: {str(e)}")
 
 
+@app.get("/feature-importance")
+async def feature_importance(sample_size: int = Query(5000, ge=1)):
+    """Global feature importance from SHAP contributions over a sample of the data"""
+    global data_loaded, model_trained
+    if not data_loaded:
+        raise HTTPException(status_code=400, detail="Data not loaded. Please load data first.")
+    if not model_trained:
+        raise HTTPException(status_code=400, detail="Model not trained. Please train the model first.")
+
+    try:
+        df = data_processor.get_data()
+        if len(df) > sample_size:
+            df = df.sample(n=sample_size, random_state=42)
+        importance = ml_model.get_global_importance(rule_engine.apply_rules(df))
+
+        return {
+            "status": "success",
+            "sample_size": len(df),
+            "feature_importance": importance
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error computing feature importance: {str(e)}")
+
+
+@app.get("/drift")
+async def get_drift():
+    """Compare the features of scored traffic with the training distribution"""
+    global model_trained
+    if not model_trained:
+        raise HTTPException(status_code=400, detail="Model not trained. Please train the model first.")
+    if ml_model.drift_reference is None:
+        raise HTTPException(status_code=400, detail="Model has no training distribution. Please retrain the model.")
+
+    return {
+        "status": "success",
+        "drift": ml_model.drift_monitor.get_report()
+    }
+
+
 @app.get("/stats")
 async def get_stats():
     """Get dataset statistics and model performance"""
@@ -245,16 +514,40 @@ async def get_stats():
         raise HTTPException(status_code=500, detail=f"Error getting stats: {str(e)}")
 
 
+@app.get("/memory-report")
+async def get_memory_report():
+    """Get per-endpoint peak memory (enable with FRAUD_MEMORY_REPORT=1)"""
+    return {
+        "status": "success",
+        "report": memory_report.get_report()
+    }
+
+
+@app.get("/metrics")
+async def get_metrics():
+    """Expose latency histograms and counters in the Prometheus text format"""
+    return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
     return {
         "status": "healthy",
         "data_loaded": data_loaded,
-        "model_trained": model_trained
+        "model_trained": model_trained,
+        "prediction_cache": prediction_cache.get_stats(),
+        "audit_log": audit_log.get_stats() if audit_log is not None else None
     }
 
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+
+    workers = int(os.environ.get("FRAUD_WORKERS", "1"))
+    if workers > 1:
+        # Workers are separate processes: they need the shared state directory
+        os.environ.setdefault("FRAUD_SHARED_DIR", os.path.join(os.path.dirname(__file__), "shared_state"))
+        uvicorn.run("main:app", host="0.0.0.0", port=8000, workers=workers)
+    else:
+        uvicorn.run(app, host="0.0.0.0", port=8000)
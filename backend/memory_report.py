@@ -0,0 +1,67 @@
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, Any
+
+
+class MemoryReport:
+    """
+    Per-endpoint peak memory tracking based on tracemalloc
+
+    tracemalloc slows allocations down noticeably, so tracking is opt-in. NumPy
+    (and therefore pandas) reports its buffers to tracemalloc, so peaks include
+    DataFrame copies. Peaks are process-wide: concurrent requests are attributed
+    to whichever endpoint is being measured.
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.endpoints = {}
+        self._lock = threading.Lock()
+
+        if self.enabled and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def track(self, endpoint: str):
+        """Measure the peak memory allocated while the block runs"""
+        if not self.enabled:
+            yield
+            return
+
+        with self._lock:
+            tracemalloc.reset_peak()
+            start, _ = tracemalloc.get_traced_memory()
+        try:
+            yield
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            self._record(endpoint, peak - start, current - start)
+
+    def _record(self, endpoint: str, peak: int, retained: int):
+        with self._lock:
+            entry = self.endpoints.setdefault(endpoint, {
+                "calls": 0,
+                "last_peak_mb": 0.0,
+                "max_peak_mb": 0.0,
+                "last_retained_mb": 0.0
+            })
+            entry["calls"] += 1
+            entry["last_peak_mb"] = peak / 1024 ** 2
+            entry["max_peak_mb"] = max(entry["max_peak_mb"], peak / 1024 ** 2)
+            entry["last_retained_mb"] = retained / 1024 ** 2
+
+    def get_report(self) -> Dict[str, Any]:
+        """Get peak memory statistics for every endpoint seen so far"""
+        if not self.enabled:
+            return {"enabled": False, "endpoints": {}}
+
+        current, _ = tracemalloc.get_traced_memory()
+        with self._lock:
+            endpoints = {name: dict(entry) for name, entry in self.endpoints.items()}
+
+        return {
+            "enabled": True,
+            "traced_current_mb": current / 1024 ** 2,
+            "endpoints": endpoints
+        }
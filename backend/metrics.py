@@ -0,0 +1,179 @@
+import threading
+import time
+from bisect import bisect_left
+from typing import List, Tuple
+
+
+# Latency buckets in seconds, from 50 microseconds to 10 seconds
+LATENCY_BUCKETS = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 10.0
+)
+
+BATCH_SIZE_BUCKETS = (1, 2, 5, 10, 50, 100, 1000, 10000, 100000, 1000000)
+
+
+def _label_text(labels: Tuple[Tuple[str, str], ...], extra: str = "") -> str:
+    parts = [f'{key}="{value}"' for key, value in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    """Monotonic counter, optionally split by labels"""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, description: str):
+        self.name = name
+        self.description = description
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels) -> float:
+        return self._values.get(tuple(sorted(labels.items())), 0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = dict(self._values)
+        return [f"{self.name}{_label_text(key)} {value}" for key, value in values.items()]
+
+
+class Gauge(Counter):
+    """Value that can go up and down"""
+
+    type_name = "gauge"
+
+    def set(self, value: float, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram
+
+    Observations only increment one bucket; cumulative counts are computed when
+    the histogram is rendered, so recording stays cheap between scrapes.
+    """
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, description: str, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.description = description
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(sorted(labels.items()))
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            snapshot = {key: (list(counts), total, count)
+                        for key, (counts, total, count) in self._series.items()}
+
+        lines = []
+        for key, (counts, total, count) in snapshot.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                bucket_label = _label_text(key, 'le="%s"' % bound)
+                lines.append(f"{self.name}_bucket{bucket_label} {cumulative}")
+            inf_label = _label_text(key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{inf_label} {count}")
+            lines.append(f"{self.name}_sum{_label_text(key)} {total}")
+            lines.append(f"{self.name}_count{_label_text(key)} {count}")
+        return lines
+
+
+class _Span:
+    """Context manager that records its duration into a histogram"""
+
+    __slots__ = ("histogram", "stage", "start")
+
+    def __init__(self, histogram: Histogram, stage: str):
+        self.histogram = histogram
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.histogram.observe(time.perf_counter() - self.start, stage=self.stage)
+        return False
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered in the Prometheus text exposition format"""
+
+    def __init__(self):
+        self._metrics = {}
+
+    def _register(self, metric):
+        return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, description: str) -> Counter:
+        return self._register(Counter(name, description))
+
+    def gauge(self, name: str, description: str) -> Gauge:
+        return self._register(Gauge(name, description))
+
+    def histogram(self, name: str, description: str,
+                  buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, description, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.description}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+stage_duration = registry.histogram(
+    "fraud_stage_duration_seconds", "Time spent in each scoring stage"
+)
+batch_size = registry.histogram(
+    "fraud_batch_size_rows", "Rows processed per call of each stage", BATCH_SIZE_BUCKETS
+)
+http_requests = registry.counter(
+    "fraud_http_requests_total", "HTTP requests by method, path and status"
+)
+http_duration = registry.histogram(
+    "fraud_http_request_duration_seconds", "HTTP request latency by path"
+)
+rule_hits = registry.counter(
+    "fraud_rule_hits_total", "Rules triggered by /predict traffic"
+)
+model_version = registry.gauge(
+    "fraud_model_version", "Version of the loaded ML model (0 when untrained)"
+)
+rules_version = registry.gauge(
+    "fraud_rules_version", "Version of the active rule set"
+)
+
+
+def span(stage: str) -> _Span:
+    """Time a block of code as the given stage"""
+    return _Span(stage_duration, stage)
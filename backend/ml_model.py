@@ -1,25 +1,33 @@
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import LabelEncoder
-from sklearn.metrics import classification_report, confusion_matrix, roc_auc_score, accuracy_score, precision_score, recall_score, f1_score
-import xgboost as xgb
-import joblib
 import os
 from typing import Dict, Any, List
 
+import metrics
+from drift_monitor import DriftMonitor, build_reference
+
 
 class FraudMLModel:
     """
     XGBoost-based fraud detection model
+
+    scikit-learn, xgboost and joblib take over a second to import, so they are
+    imported when a model is first trained, saved or loaded rather than when
+    the API starts.
     """
     
-    def __init__(self):
+    def __init__(self, model_dir: str = None, drift_monitor: DriftMonitor = None):
+        self.model_dir = model_dir or os.path.join(os.path.dirname(__file__), 'saved_model')
+        self.drift_monitor = drift_monitor or DriftMonitor()
+        self.drift_reference = None
         self.model = None
         self.label_encoders = {}
         self.feature_names = []
         self.metrics = {}
         self.is_trained = False
+        self.model_version = 0
+        self._class_indexes = {}
+        metrics.model_version.set(self.model_version)
     
     def _prepare_features(self, df: pd.DataFrame, is_training: bool = True) -> pd.DataFrame:
         """
@@ -32,8 +40,6 @@ class FraudMLModel:
         Returns:
             DataFrame with encoded features
         """
-        df = df.copy()
-        
         # Select relevant columns
         feature_columns = [
             'transaction_type', 'merchant_category', 'amount_(inr)',
@@ -42,22 +48,30 @@ class FraudMLModel:
             'hour_of_day', 'day_of_week', 'is_weekend'
         ]
         
-        # Handle alternative column names
-        if 'amount (INR)' in df.columns and 'amount_(inr)' not in df.columns:
-            df['amount_(inr)'] = df['amount (INR)']
-        
         # Add rule-based features if available
         if 'rule_score' in df.columns:
             feature_columns.append('rule_score')
         if 'rule_based_fraud' in df.columns:
             feature_columns.append('rule_based_fraud')
         
-        # Filter to available columns
-        available_features = [col for col in feature_columns if col in df.columns]
-        df_features = df[available_features].copy()
+        # Project only the feature columns (handling alternative column names);
+        # encoding below replaces whole columns of this new frame, so the caller's
+        # dataframe is never modified and never copied in full
+        columns = {}
+        for col in feature_columns:
+            source = col
+            if col == 'amount_(inr)' and col not in df.columns:
+                source = 'amount (INR)'
+            if source in df.columns:
+                columns[col] = df[source]
+        df_features = pd.DataFrame(columns, index=df.index)
         
         # Encode categorical variables
-        categorical_cols = df_features.select_dtypes(include=['object']).columns.tolist()
+        categorical_cols = df_features.select_dtypes(include=['object', 'category']).columns.tolist()
+        
+        if is_training and categorical_cols:
+            from sklearn.preprocessing import LabelEncoder
+            self._class_indexes = {}
         
         for col in categorical_cols:
             if is_training:
@@ -67,10 +81,10 @@ class FraudMLModel:
             else:
                 # Transform only
                 if col in self.label_encoders:
-                    # Handle unseen labels
-                    le = self.label_encoders[col]
-                    df_features[col] = df_features[col].astype(str).apply(
-                        lambda x: le.transform([x])[0] if x in le.classes_ else -1
+                    # Vectorized lookup of each label's position in the fitted
+                    # classes; unseen labels get -1
+                    df_features[col] = self._class_index(col).get_indexer(
+                        df_features[col].astype(str)
                     )
                 else:
                     df_features[col] = 0  # Default encoding for missing encoder
@@ -81,6 +95,13 @@ class FraudMLModel:
         
         return df_features
     
+    def _class_index(self, col: str) -> pd.Index:
+        """Index over the classes of a fitted label encoder, built once per encoder"""
+        index = self._class_indexes.get(col)
+        if index is None:
+            index = self._class_indexes[col] = pd.Index(self.label_encoders[col].classes_)
+        return index
+    
     def train(self, df: pd.DataFrame, test_size: float = 0.2, random_state: int = 42) -> Dict[str, Any]:
         """
         Train the XGBoost model
@@ -97,10 +118,17 @@ class FraudMLModel:
         if 'fraud_flag' not in df.columns:
             raise ValueError("fraud_flag column not found in dataframe")
         
+        from sklearn.model_selection import train_test_split
+        from sklearn.metrics import confusion_matrix, roc_auc_score, accuracy_score, precision_score, recall_score, f1_score
+        import xgboost as xgb
+        
         # Prepare features
         X = self._prepare_features(df, is_training=True)
         y = df['fraud_flag'].values
         
+        # Training distribution of every feature, for drift monitoring at serving time
+        self.drift_reference = build_reference(X, categorical=list(self.label_encoders))
+        
         # Split data
         X_train, X_test, y_train, y_test = train_test_split(
             X, y, test_size=test_size, random_state=random_state, stratify=y
@@ -156,6 +184,9 @@ class FraudMLModel:
         self.metrics['feature_importance'] = feature_importance.head(10).to_dict('records')
         
         self.is_trained = True
+        self.model_version += 1
+        metrics.model_version.set(self.model_version)
+        self.drift_monitor.set_reference(self.drift_reference)
         
         # Save model
         self._save_model()
@@ -175,15 +206,20 @@ class FraudMLModel:
         if not self.is_trained:
             raise ValueError("Model not trained. Please train the model first.")
         
-        X = self._prepare_features(df, is_training=False)
-        return self.model.predict(X)
+        with metrics.span("model.prepare_features"):
+            X = self._prepare_features(df, is_training=False)
+        with metrics.span("model.predict"):
+            return self.model.predict(X)
     
-    def predict_proba(self, df: pd.DataFrame) -> np.ndarray:
+    def predict_proba(self, df: pd.DataFrame, drift_observations: list = None) -> np.ndarray:
         """
         Predict fraud probabilities
         
         Args:
             df: Input dataframe
+            drift_observations: When given, the rows are added to the drift monitor's
+                live window and the observation is appended, so cached results can be
+                counted again later
             
         Returns:
             Array of fraud probabilities
@@ -191,9 +227,94 @@ class FraudMLModel:
         if not self.is_trained:
             raise ValueError("Model not trained. Please train the model first.")
         
-        X = self._prepare_features(df, is_training=False)
-        return self.model.predict_proba(X)[:, 1]
+        metrics.batch_size.observe(len(df), stage="model.predict_proba")
+        with metrics.span("model.prepare_features"):
+            X = self._prepare_features(df, is_training=False)
+        if drift_observations is not None:
+            with metrics.span("model.drift"):
+                drift_observations.append(self.drift_monitor.observe(X))
+        with metrics.span("model.predict_proba"):
+            return self.model.predict_proba(X)[:, 1]
     
+    def _contributions(self, X: pd.DataFrame) -> np.ndarray:
+        """
+        Per-feature SHAP contributions from the booster, in log-odds
+
+        Returns:
+            Array of shape (n_rows, n_features + 1); the last column is the bias
+        """
+        import xgboost as xgb
+
+        # Building the DMatrix from a plain array avoids pandas' per-column checks
+        matrix = xgb.DMatrix(X.to_numpy(dtype=np.float32), feature_names=list(X.columns))
+        return self.model.get_booster().predict(matrix, pred_contribs=True)
+
+    def predict_proba_with_contributions(self, df: pd.DataFrame, top_k: int = 5,
+                                         drift_observations: list = None):
+        """
+        Predict fraud probabilities and explain each one
+
+        Args:
+            df: Input dataframe
+            top_k: Number of contributions to return per row, largest magnitude first
+            drift_observations: When given, the rows are added to the drift monitor's
+                live window and the observation is appended, so cached results can be
+                counted again later
+
+        Returns:
+            Tuple of (array of fraud probabilities, list with each row's top
+            contributions as {'feature', 'contribution'} dicts)
+        """
+        if not self.is_trained:
+            raise ValueError("Model not trained. Please train the model first.")
+
+        metrics.batch_size.observe(len(df), stage="model.predict_proba")
+        with metrics.span("model.prepare_features"):
+            X = self._prepare_features(df, is_training=False)
+        if drift_observations is not None:
+            with metrics.span("model.drift"):
+                drift_observations.append(self.drift_monitor.observe(X))
+        with metrics.span("model.predict_proba"):
+            probabilities = self.model.get_booster().inplace_predict(X.to_numpy(dtype=np.float32))
+        with metrics.span("model.contributions"):
+            contributions = self._contributions(X)[:, :-1]
+            top = np.argsort(-np.abs(contributions), axis=1)[:, :top_k]
+
+        features = X.columns
+        explanations = [
+            [{"feature": features[j], "contribution": float(row[j])} for j in order]
+            for row, order in zip(contributions, top)
+        ]
+        return probabilities, explanations
+
+    def get_global_importance(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
+        """
+        Global feature importance from SHAP contributions
+
+        Args:
+            df: Dataframe with rule features already applied (sample it first;
+                contributions cost far more per row than predictions)
+
+        Returns:
+            Features sorted by mean absolute contribution, with their mean signed contribution
+        """
+        if not self.is_trained:
+            raise ValueError("Model not trained. Please train the model first.")
+
+        X = self._prepare_features(df, is_training=False)
+        contributions = self._contributions(X)[:, :-1]
+        mean_abs = np.abs(contributions).mean(axis=0)
+        mean = contributions.mean(axis=0)
+
+        return [
+            {
+                "feature": X.columns[j],
+                "mean_abs_contribution": float(mean_abs[j]),
+                "mean_contribution": float(mean[j])
+            }
+            for j in np.argsort(-mean_abs)
+        ]
+
     def get_metrics(self) -> Dict[str, Any]:
         """Get model performance metrics"""
         return self.metrics
@@ -201,7 +322,9 @@ class FraudMLModel:
     def _save_model(self, path: str = None):
         """Save the trained model and encoders"""
         if path is None:
-            path = os.path.join(os.path.dirname(__file__), 'saved_model')
+            path = self.model_dir
+        
+        import joblib
         
         os.makedirs(path, exist_ok=True)
         
@@ -216,11 +339,17 @@ class FraudMLModel:
         # Save feature names
         features_path = os.path.join(path, 'feature_names.pkl')
         joblib.dump(self.feature_names, features_path)
+        
+        # Save training distributions for drift monitoring
+        reference_path = os.path.join(path, 'drift_reference.pkl')
+        joblib.dump(self.drift_reference, reference_path)
     
     def load_model(self, path: str = None):
         """Load a trained model and encoders"""
         if path is None:
-            path = os.path.join(os.path.dirname(__file__), 'saved_model')
+            path = self.model_dir
+        
+        import joblib
         
         # Load model
         model_path = os.path.join(path, 'xgboost_model.pkl')
@@ -231,10 +360,18 @@ class FraudMLModel:
         encoders_path = os.path.join(path, 'label_encoders.pkl')
         if os.path.exists(encoders_path):
             self.label_encoders = joblib.load(encoders_path)
+            self._class_indexes = {}
         
         # Load feature names
         features_path = os.path.join(path, 'feature_names.pkl')
         if os.path.exists(features_path):
             self.feature_names = joblib.load(features_path)
         
+        # Load training distributions (absent for models saved before drift monitoring)
+        reference_path = os.path.join(path, 'drift_reference.pkl')
+        self.drift_reference = joblib.load(reference_path) if os.path.exists(reference_path) else None
+        self.drift_monitor.set_reference(self.drift_reference)
+        
         self.is_trained = True
+        self.model_version += 1
+        metrics.model_version.set(self.model_version)
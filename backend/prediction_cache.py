@@ -0,0 +1,92 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+import metrics
+
+
+cache_requests = metrics.registry.counter(
+    "fraud_prediction_cache_requests_total", "Prediction cache lookups by result"
+)
+cache_entries = metrics.registry.gauge(
+    "fraud_prediction_cache_entries", "Entries currently held in the prediction cache"
+)
+
+
+class PredictionCache:
+    """
+    Bounded LRU cache of scoring results with a time-to-live
+
+    Entries are keyed by the canonicalized transaction. The cache is tied to the
+    (model version, rule-set version) it was filled under and empties itself as
+    soon as a lookup arrives with different versions.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 300):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._versions = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    @staticmethod
+    def make_key(transaction: Dict[str, Any]) -> Tuple:
+        """Canonical key: validated field values in sorted field order"""
+        return tuple(transaction[field] for field in sorted(transaction))
+
+    def _check_versions(self, versions: Hashable):
+        if versions != self._versions:
+            self._entries.clear()
+            self._versions = versions
+            cache_entries.set(0)
+
+    def get(self, key: Tuple, versions: Hashable) -> Optional[Any]:
+        """Get a cached result, or None on a miss"""
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            self._check_versions(versions)
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < time.monotonic():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                cache_requests.inc(result="miss")
+                return None
+            self._entries.move_to_end(key)
+
+        cache_requests.inc(result="hit")
+        return entry[1]
+
+    def put(self, key: Tuple, versions: Hashable, value: Any):
+        """Store a result computed under the given versions"""
+        if not self.enabled:
+            return
+
+        with self._lock:
+            self._check_versions(versions)
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            cache_entries.set(len(self._entries))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get size, limits and hit/miss counts"""
+        hits = cache_requests.get(result="hit")
+        misses = cache_requests.get(result="miss")
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0
+        }
@@ -0,0 +1,240 @@
+import json
+import os
+import shutil
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def _json_default(value):
+    """Serialize numpy scalars found in reports and metrics"""
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+
+class SharedState:
+    """
+    File-based sharing of data, model and rule versions between worker processes
+
+    The directory holds a small state.json coordination file with the current
+    data, model and rule-set versions. Datasets are stored one .npy file per
+    column so every worker can memory-map the same pages read-only; text columns
+    are stored as integer codes plus their distinct values. Models are stored as
+    one artifact per version. Workers poll the coordination file (a single stat
+    call) and pick up versions published by other workers.
+    """
+
+    KEEP_VERSIONS = 2
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.state_path = os.path.join(directory, 'state.json')
+        self.lock_path = os.path.join(directory, 'state.lock')
+        self.applied = {'data': 0, 'model': 0, 'rules': 0}
+        self._seen_mtime = None
+        os.makedirs(directory, exist_ok=True)
+
+    @contextmanager
+    def _locked(self, timeout: float = 30.0):
+        """
+        Cross-process lock based on exclusive creation of a lock file
+
+        The lock file holds the owner's PID. A waiter only breaks the lock when
+        it is stale: the owner process is gone, or the file never got a PID and
+        is older than timeout. A live owner is waited for until timeout, then
+        TimeoutError is raised.
+        """
+        deadline = time.time() + timeout
+        while True:
+            try:
+                fd = os.open(self.lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                break
+            except FileExistsError:
+                if self._lock_is_stale(timeout):
+                    try:
+                        os.remove(self.lock_path)
+                    except FileNotFoundError:
+                        pass
+                    continue
+                if time.time() > deadline:
+                    raise TimeoutError(f"Timed out waiting for {self.lock_path}")
+                time.sleep(0.01)
+        try:
+            os.write(fd, str(os.getpid()).encode())
+            yield
+        finally:
+            os.close(fd)
+            try:
+                os.remove(self.lock_path)
+            except FileNotFoundError:
+                pass
+
+    def _lock_is_stale(self, timeout: float) -> bool:
+        try:
+            with open(self.lock_path) as f:
+                owner = f.read().strip()
+            modified = os.path.getmtime(self.lock_path)
+        except FileNotFoundError:
+            # Released in the meantime; just retry
+            return False
+
+        if not owner.isdigit():
+            # The owner has not written its PID yet, or died before it could
+            return time.time() - modified > timeout
+        try:
+            os.kill(int(owner), 0)
+        except ProcessLookupError:
+            return True
+        except PermissionError:
+            # Exists, owned by another user
+            return False
+        return False
+
+    def read_state(self) -> Dict[str, Any]:
+        """Read the coordination file (empty state if nothing was published yet)"""
+        try:
+            with open(self.state_path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def _write_state(self, state: Dict[str, Any]):
+        tmp_path = f"{self.state_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f, default=_json_default)
+        os.replace(tmp_path, self.state_path)
+
+    def poll(self) -> Optional[Dict[str, Any]]:
+        """Get the state if the coordination file changed since the last poll"""
+        try:
+            mtime = os.stat(self.state_path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+        if mtime == self._seen_mtime:
+            return None
+        self._seen_mtime = mtime
+        return self.read_state()
+
+    def _publish(self, kind: str, build) -> int:
+        """Allocate the next version of kind, let build() fill it, then record it"""
+        with self._locked():
+            state = self.read_state()
+            version = state.get(kind, {}).get('version', 0) + 1
+            entry = build(version)
+            entry['version'] = version
+            state[kind] = entry
+            self._write_state(state)
+
+        self.applied[kind] = version
+        self._remove_old_versions(kind, version)
+        return version
+
+    def _remove_old_versions(self, kind: str, version: int):
+        kind_dir = os.path.join(self.directory, kind)
+        if not os.path.isdir(kind_dir):
+            return
+        for name in os.listdir(kind_dir):
+            if name.startswith('v') and name[1:].isdigit() and int(name[1:]) <= version - self.KEEP_VERSIONS:
+                # Fails harmlessly on platforms that refuse to delete mapped files
+                shutil.rmtree(os.path.join(kind_dir, name), ignore_errors=True)
+
+    def publish_data(self, df: pd.DataFrame, cleaning_report: Dict[str, Any]) -> int:
+        """Write the dataset as memory-mappable column files and publish it"""
+        def build(version):
+            path = os.path.join(self.directory, 'data', f"v{version}")
+            os.makedirs(path, exist_ok=True)
+            columns = []
+
+            for i, name in enumerate(df.columns):
+                series = df[name]
+                column = {"name": name, "file": f"{i}.npy"}
+                if isinstance(series.dtype, pd.CategoricalDtype):
+                    column.update(self._save_codes(path, i, series.cat.codes.to_numpy(),
+                                                   series.cat.categories.tolist()))
+                    column["ordered"] = bool(series.cat.ordered)
+                elif series.dtype.kind in 'biufcmM' and not isinstance(series.dtype, pd.api.extensions.ExtensionDtype):
+                    np.save(os.path.join(path, column["file"]), series.to_numpy())
+                else:
+                    codes, categories = pd.factorize(series)
+                    column.update(self._save_codes(path, i, codes, categories.tolist()))
+                    column["object"] = True
+                columns.append(column)
+
+            index_file = None
+            if not isinstance(df.index, pd.RangeIndex):
+                index_file = "index.npy"
+                np.save(os.path.join(path, index_file), df.index.to_numpy())
+
+            with open(os.path.join(path, 'manifest.json'), 'w') as f:
+                json.dump({"rows": len(df), "columns": columns, "index": index_file}, f,
+                          default=_json_default)
+
+            return {"path": path, "cleaning_report": cleaning_report}
+
+        return self._publish('data', build)
+
+    @staticmethod
+    def _save_codes(path: str, i: int, codes: np.ndarray, categories: List[Any]) -> Dict[str, Any]:
+        # Store codes in the smallest dtype pandas would use, so mapping them needs no copy
+        for dtype in (np.int8, np.int16, np.int32, np.int64):
+            if len(categories) < np.iinfo(dtype).max:
+                break
+        categories_file = f"{i}.categories.json"
+        np.save(os.path.join(path, f"{i}.npy"), codes.astype(dtype, copy=False))
+        with open(os.path.join(path, categories_file), 'w') as f:
+            json.dump(categories, f, default=_json_default)
+        return {"categories": categories_file}
+
+    def load_data(self, entry: Dict[str, Any]) -> Tuple[pd.DataFrame, List[str]]:
+        """
+        Memory-map a published dataset
+
+        Returns:
+            Tuple of (read-only dataframe, names of columns that were object dtype)
+        """
+        path = entry['path']
+        with open(os.path.join(path, 'manifest.json')) as f:
+            manifest = json.load(f)
+
+        data = {}
+        object_columns = []
+        for column in manifest['columns']:
+            values = np.load(os.path.join(path, column['file']), mmap_mode='r')
+            if 'categories' in column:
+                with open(os.path.join(path, column['categories'])) as f:
+                    categories = json.load(f)
+                values = pd.Categorical.from_codes(values, categories=categories,
+                                                   ordered=column.get('ordered', False))
+            if column.get('object'):
+                object_columns.append(column['name'])
+            data[column['name']] = values
+
+        index = None
+        if manifest['index']:
+            index = np.load(os.path.join(path, manifest['index']), mmap_mode='r')
+
+        df = pd.DataFrame(data, index=index, copy=False)
+        return df, object_columns
+
+    def publish_model(self, ml_model) -> int:
+        """Save the trained model as a new shared artifact version"""
+        def build(version):
+            path = os.path.join(self.directory, 'model', f"v{version}")
+            ml_model._save_model(path)
+            return {"path": path, "metrics": ml_model.get_metrics()}
+
+        return self._publish('model', build)
+
+    def publish_rules(self, rule_engine) -> int:
+        """Publish the current rule weights and threshold"""
+        def build(version):
+            return {
+                "weights": {rule['name']: rule['weight'] for rule in rule_engine.rules},
+                "threshold": rule_engine.threshold
+            }
+
+        return self._publish('rules', build)